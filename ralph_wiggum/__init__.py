@@ -0,0 +1,11 @@
+"""Ralph Wiggum — a loop-driven smart contract audit pipeline.
+
+Agents read and write a shared JSON state through :class:`StateStore`;
+each agent records its findings under its own top-level state key.
+"""
+
+from ralph_wiggum.state import StateStore
+
+__all__ = ["StateStore"]
+
+__version__ = "0.1.0"
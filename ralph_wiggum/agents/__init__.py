@@ -0,0 +1,2 @@
+"""Audit agents. Each agent reads the shared state, does one job, and
+records its results under its own state key."""
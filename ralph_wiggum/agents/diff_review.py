@@ -0,0 +1,385 @@
+"""Differential review between two git refs.
+
+Compares the externally callable surface and vulnerability classes of
+the changed Solidity files at a base and head ref, and reports which
+classes were resolved, regressed, or left unchanged by the diff.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import subprocess
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+from ralph_wiggum.jsonio import dump_json
+from ralph_wiggum.state import StateStore
+
+# Every class the raw-source scan can produce; once a scan has found
+# them all there is nothing left to learn from the remaining files.
+_SOURCE_CLASS_UNIVERSE = frozenset({"dangerous_call"})
+
+# Needle -> class for the raw-source and detector-check scans. With
+# pyahocorasick these become one automaton pass per input regardless of
+# how many needles the class tables grow to; plain substring tests are
+# the fallback.
+_SOURCE_NEEDLES = (("call(", "dangerous_call"), ("delegatecall", "dangerous_call"))
+_CHECK_NEEDLES = (
+    ("reentrancy", "reentrancy"),
+    ("unchecked", "unchecked_return"),
+    ("delegatecall", "dangerous_call"),
+    ("call", "dangerous_call"),
+)
+
+
+def _build_automaton(needles: tuple[tuple[str, str], ...]) -> Any:
+    automaton = ahocorasick.Automaton()
+    for needle, klass in needles:
+        automaton.add_word(needle, klass)
+    automaton.make_automaton()
+    return automaton
+
+
+if ahocorasick is not None:
+    _SOURCE_AC = _build_automaton(_SOURCE_NEEDLES)
+    _CHECK_AC = _build_automaton(_CHECK_NEEDLES)
+else:
+    _SOURCE_AC = _CHECK_AC = None
+
+# Whole-buffer entry-point scan: one C-level pass finds state-changing
+# public/external declarations, replacing the per-line Python loop of
+# search + lower + substring tests. The lookahead rejects view/pure
+# within the same declaration header (up to the body or semicolon).
+_ENTRYPOINT_RE = re.compile(
+    r"function\s+(\w+)\s*\([^)]*\)[^{;]*?\b(?:public|external)\b"
+    r"(?![^{;]*\b(?:view|pure)\b)",
+    re.DOTALL,
+)
+
+
+@lru_cache(maxsize=256)
+def _show_file(repo_path: str, ref: str, path: str) -> str | None:
+    """Single ``git show`` read, memoized on ``(repo, ref, path)``.
+
+    Fallback for one-off reads outside the batched per-ref preload;
+    the cache keeps repeated lookups of the same blob free.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "show", f"{ref}:{path}"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError:
+        return None
+    return result.stdout
+
+
+@dataclass
+class DifferentialReview:
+    """Analyzes what a change set did to the audit-relevant surface."""
+
+    state_store: StateStore
+    artifacts_dir: Path
+    repo_path: Path
+    slither_json_path: Path | None = None
+
+    def run(
+        self, base_ref: str, head_ref: str, target_path: str = "."
+    ) -> dict[str, Any]:
+        # Two filtered diffs: the base analysis only wants files that
+        # exist at base (deleted or modified), the head analysis only
+        # files that exist at head (added or modified) — no batch-read
+        # request is ever issued for a path the ref doesn't have.
+        base_files = self._changed_solidity_files(
+            base_ref, head_ref, target_path, diff_filter="DM"
+        )
+        head_files = self._changed_solidity_files(
+            base_ref, head_ref, target_path, diff_filter="AM"
+        )
+        files = sorted(set(base_files) | set(head_files))
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        dump_json(self.artifacts_dir / "changed_files.json", files)
+        slither_classes, slither_digest = self._static_scan_classes()
+        base = self._analyze_ref(base_ref, base_files, slither_classes)
+        head = self._analyze_ref(head_ref, head_files, slither_classes)
+        delta = self._delta_classes(base["classes"], head["classes"])
+        report = {
+            "base": base,
+            "head": head,
+            "delta": delta,
+            "changed_files": files,
+        }
+        dump_json(self.artifacts_dir / "delta_report.json", report)
+        (self.artifacts_dir / "delta_report.md").write_text(
+            self._render_markdown(report)
+        )
+        with self.state_store.transaction() as state:
+            state["diff_review"] = {
+                "delta": delta,
+                "changed_files": files,
+                "slither_digest": slither_digest,
+                "slither_classes": sorted(slither_classes),
+            }
+        return report
+
+    def _changed_solidity_files(
+        self,
+        base_ref: str,
+        head_ref: str,
+        target_path: str,
+        diff_filter: str | None = None,
+    ) -> list[str]:
+        # -z emits NUL-separated, unquoted paths: one split on the raw
+        # bytes and a suffix check per entry, with no per-line strip()
+        # copies and no quoting edge cases for unusual filenames.
+        command = ["git", "diff", "-z", "--name-only", "--ignore-submodules=all"]
+        if diff_filter is not None:
+            command.append(f"--diff-filter={diff_filter}")
+        command += [base_ref, head_ref, "--", target_path]
+        result = subprocess.run(
+            command,
+            cwd=self.repo_path,
+            capture_output=True,
+            check=True,
+        )
+        return sorted(
+            path.decode()
+            for path in result.stdout.split(b"\x00")
+            if path.endswith(b".sol")
+        )
+
+    def _read_file_at_ref(self, ref: str, path: str) -> str | None:
+        return _show_file(str(self.repo_path), ref, path)
+
+    def _batch_read_files(
+        self, ref: str, paths: list[str]
+    ) -> dict[str, str | None]:
+        """Read every ``ref:path`` blob through one ``git cat-file --batch``.
+
+        A single spawned process replaces one ``git show`` fork per
+        file; missing paths (e.g. files that don't exist at this ref)
+        map to ``None``.
+        """
+        if not paths:
+            return {}
+        process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        requests = "".join(f"{ref}:{path}\n" for path in paths).encode()
+        output, _ = process.communicate(requests)
+        contents: dict[str, str | None] = {}
+        pos = 0
+        for path in paths:
+            header_end = output.index(b"\n", pos)
+            header = output[pos:header_end].split()
+            pos = header_end + 1
+            # Header is "<sha> <type> <size>" or "<object> missing".
+            if header[-1] == b"missing":
+                contents[path] = None
+                continue
+            size = int(header[2])
+            contents[path] = output[pos : pos + size].decode(errors="replace")
+            pos += size + 1  # blob bytes plus the trailing newline
+        return contents
+
+    def _analyze_ref(
+        self, ref: str, files: list[str], slither_classes: set[str]
+    ) -> dict[str, Any]:
+        # One batched read per ref; entry-point and class extraction
+        # both consume the same preloaded mapping instead of each
+        # fetching (and splitting) every file again.
+        contents = self._batch_read_files(ref, files)
+        entrypoints = self._entrypoints_for_ref(ref, contents)
+        classes = self._classes_from_source(contents)
+        classes |= slither_classes
+        return {"ref": ref, "entrypoints": entrypoints, "classes": sorted(classes)}
+
+    def _entrypoints_for_ref(
+        self, ref: str, contents: dict[str, str | None]
+    ) -> dict[str, list[dict[str, Any]]]:
+        # CPython's re holds the GIL for the whole match, so the
+        # per-file scans are a plain loop: a thread pool here would add
+        # scheduling overhead without any actual overlap. Insertion
+        # order follows the mapping, keeping the output deterministic.
+        results: dict[str, list[dict[str, Any]]] = {}
+        for path, content in contents.items():
+            if content is None:
+                continue
+            entrypoints = self._entrypoints_from_source(content)
+            if entrypoints:
+                results[path] = entrypoints
+        dump_json(
+            self.artifacts_dir / f"entrypoints_{ref.replace('/', '_')}.json",
+            results,
+        )
+        return results
+
+    @staticmethod
+    def _entrypoints_from_source(content: str) -> list[dict[str, Any]]:
+        # Line numbers are recovered from match offsets with a bisect
+        # over the newline positions, so no per-line loop runs at all.
+        line_starts = [0]
+        offset = content.find("\n")
+        while offset != -1:
+            line_starts.append(offset + 1)
+            offset = content.find("\n", offset + 1)
+        return [
+            {
+                "name": match.group(1),
+                "line": bisect_right(line_starts, match.start()),
+            }
+            for match in _ENTRYPOINT_RE.finditer(content)
+        ]
+
+    @staticmethod
+    def _classify_source(content: str) -> set[str]:
+        classes: set[str] = set()
+        if _SOURCE_AC is not None:
+            for _, klass in _SOURCE_AC.iter(content):
+                classes.add(klass)
+                if classes >= _SOURCE_CLASS_UNIVERSE:
+                    break
+        elif "call(" in content or "delegatecall" in content:
+            classes.add("dangerous_call")
+        return classes
+
+    @classmethod
+    def _classes_from_source(cls, contents: dict[str, str | None]) -> set[str]:
+        loaded = [
+            content for content in contents.values() if content is not None
+        ]
+        if not loaded:
+            return set()
+        classes: set[str] = set()
+        # Same GIL reality as the entrypoint scan: both the automaton
+        # walk and the substring fallback hold the GIL throughout, so a
+        # thread pool adds scheduling cost without overlap.
+        for content in loaded:
+            classes |= cls._classify_source(content)
+            # The result set only grows; stop once every extractable
+            # class has been seen — for the common case of a dangerous
+            # call early in the diff this turns the full scan into an
+            # O(1) exit.
+            if classes >= _SOURCE_CLASS_UNIVERSE:
+                break
+        return classes
+
+    def _static_scan_classes(self) -> tuple[set[str], str | None]:
+        """Slither-derived classes plus the report's content digest.
+
+        The report only changes when a new Slither run rewrites it, so
+        the extracted classes are cached in the state keyed by the
+        file's SHA-256; an unchanged digest skips the re-parse.
+        """
+        if self.slither_json_path is None or not self.slither_json_path.exists():
+            return set(), None
+        with self.slither_json_path.open("rb") as fh:
+            digest = hashlib.file_digest(fh, "sha256").hexdigest()
+        previous = self.state_store.load().get("diff_review") or {}
+        if previous.get("slither_digest") == digest:
+            return set(previous.get("slither_classes") or []), digest
+        return self._classes_from_slither(self.slither_json_path), digest
+
+    @staticmethod
+    def _iter_slither_detectors(path: Path) -> Any:
+        # Detector entries are classified one at a time, so with ijson
+        # the report is never materialized in memory; the stdlib parse
+        # of the whole file is only the fallback.
+        with path.open("rb") as fh:
+            if ijson is not None:
+                yield from ijson.items(fh, "results.detectors.item")
+                return
+            data = json.load(fh)
+        yield from (data.get("results") or {}).get("detectors") or []
+
+    @classmethod
+    def _classes_from_slither(cls, path: Path) -> set[str]:
+        classes: set[str] = set()
+        for detector in cls._iter_slither_detectors(path):
+            check = (detector.get("check") or "").lower()
+            if _CHECK_AC is not None:
+                for _, klass in _CHECK_AC.iter(check):
+                    classes.add(klass)
+                continue
+            if "reentrancy" in check:
+                classes.add("reentrancy")
+            if "unchecked" in check:
+                classes.add("unchecked_return")
+            if "delegatecall" in check or "call" in check:
+                classes.add("dangerous_call")
+        return classes
+
+    @staticmethod
+    def _delta_classes(base: list[str], head: list[str]) -> dict[str, list[str]]:
+        # One sort of the union and a single walk partitions all three
+        # buckets, instead of three set operations each sorted
+        # separately.
+        base_set, head_set = set(base), set(head)
+        resolved: list[str] = []
+        regressed: list[str] = []
+        unchanged: list[str] = []
+        for klass in sorted(base_set | head_set):
+            if klass not in head_set:
+                resolved.append(klass)
+            elif klass not in base_set:
+                regressed.append(klass)
+            else:
+                unchanged.append(klass)
+        return {
+            "resolved": resolved,
+            "regressed": regressed,
+            "unchanged": unchanged,
+        }
+
+    def _render_markdown(self, report: dict[str, Any]) -> str:
+        # One template with joined subexpressions for the variable
+        # sections: each section becomes a single join instead of a
+        # Python-level append per row.
+        delta = report["delta"]
+        changed = "\n".join(
+            f"- {path}" for path in report["changed_files"]
+        ) or "- none"
+        delta_rows = "\n".join(
+            f"- {key}: {', '.join(delta[key]) or 'none'}"
+            for key in ("resolved", "regressed", "unchanged")
+        )
+        entrypoints = "\n".join(
+            f"- {path}: {', '.join(entry['name'] for entry in entries)}"
+            for path, entries in sorted(report["head"]["entrypoints"].items())
+        ) or "- none"
+        return (
+            f"# Differential review\n"
+            f"\n"
+            f"Base: `{report['base']['ref']}`\n"
+            f"Head: `{report['head']['ref']}`\n"
+            f"\n"
+            f"## Changed files\n"
+            f"{changed}\n"
+            f"\n"
+            f"## Class delta\n"
+            f"{delta_rows}\n"
+            f"\n"
+            f"## Entry points (head)\n"
+            f"{entrypoints}\n"
+        )
@@ -0,0 +1,74 @@
+"""Fuzzing agent: drives forge's fuzz tests when static signals warrant it."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from ralph_wiggum.state import StateStore
+from ralph_wiggum.tools.runners import FoundryRunner
+
+
+@functools.cache
+def _score_signals(frozen_items: tuple[tuple[str, int], ...]) -> int:
+    """Total signal count for a frozen signals snapshot."""
+    return sum(count for _, count in frozen_items)
+
+
+@dataclass
+class FuzzAgent:
+    """Runs the fuzz suite when the static scan produced signals."""
+
+    state_store: StateStore
+    runner: FoundryRunner
+    _precondition_memo: tuple[Any, bool] | None = field(
+        default=None, init=False, repr=False
+    )
+
+    def should_run(self, state: dict[str, Any]) -> bool:
+        # Orchestration loops poll this many times between runs; hash the
+        # relevant state slices and reuse the last answer when unchanged.
+        budget = state.get("budget") or {}
+        static_signals = (state.get("static_scan") or {}).get("signals") or {}
+        key = (
+            (budget.get("cap"), budget.get("spent", 0)),
+            tuple(sorted(static_signals.items())),
+        )
+        memo = self._precondition_memo
+        if memo is not None and memo[0] == key:
+            return memo[1]
+        (cap, spent), signals_frozen = key
+        result = (
+            cap is None or spent < cap
+        ) and _score_signals(signals_frozen) > 0
+        self._precondition_memo = (key, result)
+        return result
+
+    def compute(
+        self, state: dict[str, Any], target_path: Path
+    ) -> dict[str, Any]:
+        """Produce this agent's result without touching the state store."""
+        if not self.should_run(state):
+            return {
+                "status": "skipped",
+                "reason": "no static signals or budget exhausted",
+            }
+        return self.runner.run(target_path)
+
+    def run(
+        self, target_path: Path, state: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        if state is None:
+            with self.state_store.transaction() as state:
+                return self.run(target_path, state)
+        result = self.compute(state, target_path)
+        state["fuzz_agent"] = result
+        return result
+
+    async def run_async(
+        self, state: dict[str, Any], target_path: Path
+    ) -> dict[str, Any]:
+        return await asyncio.to_thread(self.compute, state, target_path)
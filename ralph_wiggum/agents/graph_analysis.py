@@ -0,0 +1,613 @@
+"""Call-graph analysis over Slither JSON output.
+
+Builds a directed call graph from the Slither export, flags call cycles
+(potential reentrancy surface), privileged entry points, and externally
+reachable call sites. Uses ``networkx`` when installed and falls back to
+an int-indexed adjacency-list implementation otherwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import json
+import os
+import re
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:
+    import networkx as nx
+except ImportError:  # pragma: no cover - optional dependency
+    nx = None
+
+from ralph_wiggum.jsonio import dump_json, load_json
+from ralph_wiggum.state import StateStore
+
+# Node colors for the iterative depth-first search.
+_WHITE, _GRAY, _BLACK = 0, 1, 2
+
+_EXTERNAL_CALL_MARKERS = ("call", "delegatecall", "send", "transfer")
+
+_EXTERNAL_VISIBILITY = frozenset({"public", "external"})
+
+# The only top-level report sections the analysis reads; everything
+# else — notably the detector array, which dominates large reports —
+# is skipped when loading from disk.
+_REPORT_SECTIONS = ("call_graph", "function_calls", "functions")
+
+
+@dataclass(slots=True)
+class _FallbackGraph:
+    """Call graph packed into parallel arrays for the no-networkx path.
+
+    Function names are remapped to dense int ids once at build time;
+    traversals then index ``adj`` directly instead of hashing string
+    keys. ``sources``/``targets`` hold the raw edge list as int arrays.
+    """
+
+    adj: list[list[int]]
+    names: list[str]
+    ids: dict[str, int]
+    sources: array
+    targets: array
+
+
+@dataclass
+class GraphAnalysis:
+    """Scores structural risk signals extracted from the call graph."""
+
+    # One C-level scan per modifier instead of a Python keyword loop.
+    _PRIV_RE = re.compile(r"onlyowner|owner|admin|onlyrole", re.IGNORECASE)
+
+    state_store: StateStore
+    artifacts_dir: Path | None = None
+    # Full simple-cycle enumeration is O((V+E)(C+1)) and can explode on
+    # dense contracts; the score only needs existence, so enumeration is
+    # opt-in and the default stores one representative cycle.
+    enumerate_cycles: bool = False
+    # Findings lists are truncated to this many entries; consumers only
+    # ever render a bounded prefix anyway.
+    findings_top_k: int = 50
+    _descendants_cache: dict[Any, frozenset] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _privileged_memo: dict[int, set[str]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def analyze(
+        self,
+        slither_json: dict[str, Any],
+        state: dict[str, Any] | None = None,
+        input_key: str | None = None,
+    ) -> dict[str, Any]:
+        if state is None:
+            with self.state_store.transaction() as state:
+                return self.analyze(slither_json, state, input_key)
+        findings = self.compute(slither_json, input_key=input_key)
+        state["graph_analysis"] = findings
+        return findings
+
+    def analyze_path(
+        self,
+        slither_json_path: Path,
+        state: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Analyze a Slither report straight from disk.
+
+        With ijson only the sections the graph actually walks are
+        parsed (one streaming pass each), so the detector array is
+        never held in memory; without it the whole file is parsed once.
+        The result-cache key is hashed from the file bytes in chunks,
+        which skips ``compute``'s re-serialization of the parsed blob.
+        """
+        path = Path(slither_json_path)
+        with path.open("rb") as fh:
+            input_key = hashlib.file_digest(
+                fh, lambda: hashlib.blake2b(digest_size=16)
+            ).hexdigest()
+        return self.analyze(self._load_report(path), state, input_key)
+
+    @staticmethod
+    def _load_report(path: Path) -> dict[str, Any]:
+        path = Path(path)
+        if ijson is None:
+            return json.loads(path.read_text())
+        report: dict[str, Any] = {}
+        for section in _REPORT_SECTIONS:
+            with path.open("rb") as fh:
+                for value in ijson.items(fh, section):
+                    if value is not None:
+                        report[section] = value
+                    break
+        return report
+
+    async def run_async(self, slither_json: dict[str, Any]) -> dict[str, Any]:
+        return await asyncio.to_thread(self.compute, slither_json)
+
+    def compute(
+        self, slither_json: dict[str, Any], input_key: str | None = None
+    ) -> dict[str, Any]:
+        """Produce the findings without touching the state store."""
+        # Both per-report memos reset together: entries keyed by object
+        # identity must not survive into the next report, where CPython
+        # can reuse the same addresses.
+        self._descendants_cache = {}
+        self._privileged_memo = {}
+
+        cache_path = None
+        if self.artifacts_dir is not None:
+            content_key = input_key or hashlib.blake2b(
+                json.dumps(slither_json, sort_keys=True).encode(),
+                digest_size=16,
+            ).hexdigest()
+            # Config that changes the findings is part of the key, so
+            # instances sharing an artifacts_dir but configured
+            # differently never serve each other's results.
+            key = (
+                f"{content_key}-c{int(self.enumerate_cycles)}"
+                f"k{self.findings_top_k}"
+            )
+            cache_path = self.artifacts_dir / "graph_cache" / f"{key}.json"
+            cached = self._load_cached_findings(cache_path, key)
+            if cached is not None:
+                return cached
+
+        graph, backend = self._build_call_graph(slither_json)
+        if self.enumerate_cycles:
+            cycles = self._enumerate_cycles(graph, backend)
+        else:
+            representative = self._has_cycle(graph, backend)
+            cycles = [representative] if representative is not None else []
+        privileged = self._privileged_entry_points(slither_json)
+        external_callers = self._external_callers(slither_json)
+        sensitive = self._sensitive_external_calls(
+            graph, backend, privileged, external_callers
+        )
+
+        score = 0
+        if cycles:
+            score += 1
+        if sensitive:
+            score += 1
+
+        findings = {
+            "backend": backend,
+            "cycles": sorted(cycles),
+            "privileged_entry_points": self._bounded_sorted(privileged),
+            "sensitive_external_calls": self._bounded_sorted(sensitive),
+            "risk_score": score,
+        }
+        if cache_path is not None:
+            self._write_cached_findings(cache_path, key, findings)
+        return findings
+
+    def _bounded_sorted(self, values: set[str]) -> list[str]:
+        """Deterministic bounded output: O(n log k) when truncating."""
+        if len(values) > self.findings_top_k:
+            return heapq.nsmallest(self.findings_top_k, values)
+        return sorted(values)
+
+    # -- result caching -----------------------------------------------------
+
+    @staticmethod
+    def _load_cached_findings(
+        cache_path: Path, key: str
+    ) -> dict[str, Any] | None:
+        """Previously computed findings for this input hash, if any."""
+        try:
+            payload = load_json(cache_path)
+        except (OSError, ValueError):
+            return None
+        if payload.get("input_hash") != key:
+            return None
+        return payload.get("findings")
+
+    @staticmethod
+    def _write_cached_findings(
+        cache_path: Path, key: str, findings: dict[str, Any]
+    ) -> None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        dump_json(
+            tmp_path, {"input_hash": key, "findings": findings}, pretty=False
+        )
+        os.replace(tmp_path, cache_path)
+
+    # -- graph construction -------------------------------------------------
+
+    @staticmethod
+    def _iter_call_edges(
+        slither_json: dict[str, Any],
+        intern: dict[str, str] | None = None,
+    ) -> Iterable[tuple[str, str]]:
+        """All (caller, callee) pairs across the three Slither sources.
+
+        Slither repeats the same function names across every section;
+        interning through ``intern`` collapses the duplicates to one str
+        object each, so downstream dict/set operations hit the cached
+        hash and identity-compare on the hot path.
+        """
+        if intern is None:
+            intern = {}
+        unique = intern.setdefault
+        call_graph = slither_json.get("call_graph") or {}
+        for edge in call_graph.get("edges") or []:
+            source = edge.get("from")
+            target = edge.get("to")
+            if source is not None and target is not None:
+                yield unique(source, source), unique(target, target)
+        for call in slither_json.get("function_calls") or []:
+            source = call.get("caller")
+            target = call.get("callee")
+            if source is not None and target is not None:
+                yield unique(source, source), unique(target, target)
+        for function in slither_json.get("functions") or []:
+            name = function.get("name")
+            if name is None:
+                continue
+            name = unique(name, name)
+            for callee in function.get("calls") or []:
+                if callee is not None:
+                    yield name, unique(callee, callee)
+
+    def _build_call_graph(
+        self, slither_json: dict[str, Any]
+    ) -> tuple[Any, str]:
+        intern: dict[str, str] = {}
+        unique = intern.setdefault
+        call_graph = slither_json.get("call_graph") or {}
+        declared_nodes = [
+            unique(node, node)
+            for node in call_graph.get("nodes") or []
+            if node is not None
+        ]
+
+        if nx is not None:
+            # Bulk insertion: one Python frame into networkx's tight loop
+            # instead of a pure-Python add_edge call (and its attribute
+            # dict allocation) per edge. Slither emits duplicate call
+            # edges, so dedup before handing the batch over.
+            graph: Any = nx.DiGraph()
+            graph.add_nodes_from(declared_nodes)
+            graph.add_edges_from(
+                set(self._iter_call_edges(slither_json, intern))
+            )
+            return graph, "networkx"
+
+        ids: dict[str, int] = {}
+        names: list[str] = []
+        adj: list[list[int]] = []
+        sources = array("i")
+        targets = array("i")
+
+        def node_id(name: str) -> int:
+            known = ids.get(name)
+            if known is None:
+                known = len(names)
+                ids[name] = known
+                names.append(name)
+                adj.append([])
+            return known
+
+        for node in declared_nodes:
+            node_id(node)
+        for source, target in self._iter_call_edges(slither_json, intern):
+            source_id = node_id(source)
+            target_id = node_id(target)
+            sources.append(source_id)
+            targets.append(target_id)
+            adj[source_id].append(target_id)
+        return _FallbackGraph(adj, names, ids, sources, targets), "fallback"
+
+    # -- cycle detection ----------------------------------------------------
+
+    def _has_cycle(self, graph: Any, backend: str) -> list[str] | None:
+        """A single representative cycle, or None if the graph is acyclic.
+
+        Detection only — no enumeration — so this stays linear even on
+        graphs with exponentially many simple cycles.
+        """
+        if backend == "networkx":
+            try:
+                return [source for source, _ in nx.find_cycle(graph)]
+            except nx.NetworkXNoCycle:
+                return None
+        found = self._fallback_cycles(graph.adj, first_only=True)
+        if not found:
+            return None
+        return [graph.names[node] for node in found[0]]
+
+    def _enumerate_cycles(self, graph: Any, backend: str) -> list[list[str]]:
+        """Enumerate cycles per non-trivial strongly connected component.
+
+        Slither call graphs are mostly DAG-like, so restricting the cycle
+        search to SCCs of size >= 2 (plus self-loops) prunes the bulk of
+        the graph before the costly enumeration starts.
+        """
+        cycles: list[list[str]] = []
+        if backend == "networkx":
+            for scc in nx.strongly_connected_components(graph):
+                if len(scc) == 1:
+                    node = next(iter(scc))
+                    if graph.has_edge(node, node):
+                        cycles.append([node])
+                    continue
+                subgraph = graph.subgraph(scc)
+                cycles.extend(list(cycle) for cycle in nx.simple_cycles(subgraph))
+            return cycles
+        adj = graph.adj
+        names = graph.names
+        for scc in self._fallback_sccs(adj):
+            if len(scc) == 1:
+                node = next(iter(scc))
+                if node in adj[node]:
+                    cycles.append([names[node]])
+                continue
+            cycles.extend(
+                [names[node] for node in cycle]
+                for cycle in self._fallback_cycles(adj, scc)
+            )
+        return cycles
+
+    @staticmethod
+    def _fallback_cycles(
+        adj: list[list[int]],
+        members: set[int] | None = None,
+        first_only: bool = False,
+    ) -> list[list[int]]:
+        """Collect cycles with an iterative three-color depth-first search.
+
+        An explicit work stack avoids CPython's recursion limit on deep
+        call chains, and cycles are reconstructed by walking parent
+        pointers — O(cycle length) per hit instead of scanning the stack.
+        When ``members`` is given the search is confined to that set.
+        """
+        cycles: list[list[int]] = []
+        node_count = len(adj)
+        color = bytearray(node_count)
+        parent = [0] * node_count
+        roots = range(node_count) if members is None else members
+        for root in roots:
+            if color[root] != _WHITE:
+                continue
+            color[root] = _GRAY
+            work_stack = [(root, iter(adj[root]))]
+            while work_stack:
+                node, neighbors = work_stack[-1]
+                advanced = False
+                for neighbor in neighbors:
+                    if members is not None and neighbor not in members:
+                        continue
+                    state = color[neighbor]
+                    if state == _WHITE:
+                        color[neighbor] = _GRAY
+                        parent[neighbor] = node
+                        work_stack.append((neighbor, iter(adj[neighbor])))
+                        advanced = True
+                        break
+                    if state == _GRAY:
+                        cycle = [node]
+                        current = node
+                        while current != neighbor:
+                            current = parent[current]
+                            cycle.append(current)
+                        cycle.reverse()
+                        cycles.append(cycle)
+                        if first_only:
+                            return cycles
+                if not advanced:
+                    color[node] = _BLACK
+                    work_stack.pop()
+        return cycles
+
+    @staticmethod
+    def _fallback_sccs(adj: list[list[int]]) -> list[set[int]]:
+        """Tarjan's strongly connected components, iteratively.
+
+        Uses the same explicit-stack scaffold as ``_fallback_cycles`` so
+        deep graphs never touch the interpreter recursion limit.
+        Components are emitted sinks-first (reverse topological order).
+        """
+        node_count = len(adj)
+        unvisited = -1
+        index_of = [unvisited] * node_count
+        lowlink = [0] * node_count
+        on_stack = bytearray(node_count)
+        scc_stack: list[int] = []
+        sccs: list[set[int]] = []
+        counter = 0
+        for root in range(node_count):
+            if index_of[root] != unvisited:
+                continue
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            scc_stack.append(root)
+            on_stack[root] = 1
+            work_stack = [(root, iter(adj[root]))]
+            while work_stack:
+                node, neighbors = work_stack[-1]
+                advanced = False
+                for neighbor in neighbors:
+                    if index_of[neighbor] == unvisited:
+                        index_of[neighbor] = lowlink[neighbor] = counter
+                        counter += 1
+                        scc_stack.append(neighbor)
+                        on_stack[neighbor] = 1
+                        work_stack.append((neighbor, iter(adj[neighbor])))
+                        advanced = True
+                        break
+                    if on_stack[neighbor] and index_of[neighbor] < lowlink[node]:
+                        lowlink[node] = index_of[neighbor]
+                if not advanced:
+                    work_stack.pop()
+                    if work_stack:
+                        parent_node = work_stack[-1][0]
+                        if lowlink[node] < lowlink[parent_node]:
+                            lowlink[parent_node] = lowlink[node]
+                    if lowlink[node] == index_of[node]:
+                        component = set()
+                        while True:
+                            member = scc_stack.pop()
+                            on_stack[member] = 0
+                            component.add(member)
+                            if member == node:
+                                break
+                        sccs.append(component)
+        return sccs
+
+    # -- reachability -------------------------------------------------------
+
+    @staticmethod
+    def _fallback_reachable(adj: list[list[int]], source: int) -> set[int]:
+        """All nodes reachable from ``source`` via breadth-first search."""
+        visited = {source}
+        queue = deque((source,))
+        while queue:
+            node = queue.popleft()
+            for neighbor in adj[node]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append(neighbor)
+        return visited
+
+    def _populate_descendants(self, graph: Any, backend: str) -> None:
+        """Fill ``_descendants_cache`` with every node's descendant set.
+
+        Components are processed in reverse topological order of the SCC
+        condensation, so each successor's set is already cached when a
+        component is handled and every node is computed exactly once.
+        Entries that funnel into shared subgraphs then reuse the same
+        frozenset instead of re-exploring it.
+        """
+        cache = self._descendants_cache
+        if backend == "networkx":
+            condensation = nx.condensation(graph)
+            components = [
+                condensation.nodes[comp_id]["members"]
+                for comp_id in reversed(list(nx.topological_sort(condensation)))
+            ]
+
+            def successors(node: Any) -> Any:
+                return graph.successors(node)
+
+            def has_self_loop(node: Any) -> bool:
+                return graph.has_edge(node, node)
+
+        else:
+            adj = graph.adj
+            components = self._fallback_sccs(adj)
+
+            def successors(node: Any) -> Any:
+                return adj[node]
+
+            def has_self_loop(node: Any) -> bool:
+                return node in adj[node]
+
+        for members in components:
+            if len(members) > 1:
+                descendants = set(members)
+            else:
+                node = next(iter(members))
+                descendants = {node} if has_self_loop(node) else set()
+            for member in members:
+                for neighbor in successors(member):
+                    if neighbor not in members:
+                        descendants.add(neighbor)
+                        descendants |= cache[neighbor]
+            frozen = frozenset(descendants)
+            for member in members:
+                cache[member] = frozen
+
+    # -- signal extraction --------------------------------------------------
+
+    def _privileged_entry_points(self, slither_json: dict[str, Any]) -> set[str]:
+        # In-session memo: the same parsed Slither blob is often analyzed
+        # repeatedly within one process.
+        memo_key = id(slither_json)
+        cached = self._privileged_memo.get(memo_key)
+        if cached is not None:
+            return cached
+        privileged = set()
+        search = self._PRIV_RE.search
+        for function in slither_json.get("functions") or []:
+            name = function.get("name")
+            if name is None:
+                continue
+            if function.get("visibility") in _EXTERNAL_VISIBILITY and any(
+                search(modifier)
+                for modifier in function.get("modifiers") or ()
+            ):
+                privileged.add(name)
+        self._privileged_memo[memo_key] = privileged
+        return privileged
+
+    def _external_callers(self, slither_json: dict[str, Any]) -> set[str]:
+        callers = set()
+        for function in slither_json.get("functions") or []:
+            name = function.get("name")
+            if name is None:
+                continue
+            if any(
+                marker in callee
+                for callee in function.get("calls") or []
+                for marker in _EXTERNAL_CALL_MARKERS
+            ):
+                callers.add(name)
+        return callers
+
+    def _sensitive_external_calls(
+        self,
+        graph: Any,
+        backend: str,
+        privileged: set[str],
+        external_callers: set[str],
+    ) -> set[str]:
+        """Externally calling functions reachable from a privileged entry.
+
+        Descendant sets come from the memoized per-node cache, so entries
+        sharing a common subgraph intersect the same frozenset instead of
+        re-traversing it.
+        """
+        risky: set[str] = set()
+        if not privileged or not external_callers:
+            return risky
+        if not self._descendants_cache:
+            self._populate_descendants(graph, backend)
+        cache = self._descendants_cache
+        if backend == "networkx":
+            for entry in privileged:
+                reachable = cache.get(entry)
+                if reachable is None:
+                    continue
+                risky |= reachable & external_callers
+                if entry in external_callers:
+                    risky.add(entry)
+            return risky
+        ids = graph.ids
+        names = graph.names
+        external_ids = {
+            ids[name] for name in external_callers if name in ids
+        }
+        risky_ids: set[int] = set()
+        for entry in privileged:
+            entry_id = ids.get(entry)
+            if entry_id is None:
+                continue
+            reachable = cache.get(entry_id)
+            if reachable is not None:
+                risky_ids |= reachable & external_ids
+            if entry_id in external_ids:
+                risky_ids.add(entry_id)
+        risky.update(names[node] for node in risky_ids)
+        return risky
@@ -0,0 +1,242 @@
+"""LLM-backed synthesis of audit findings.
+
+Talks to an OpenAI-compatible chat endpoint (vLLM in the local setup)
+or replays canned responses from a fixtures directory when offline.
+Request/response payloads are persisted under ``artifacts_dir/llm`` for
+replay and debugging.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib import request as urllib_request
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if msgspec is not None:
+
+    class ChatMessage(msgspec.Struct):
+        """One chat turn in an OpenAI-compatible request."""
+
+        role: str
+        content: str
+
+    class ChatRequest(msgspec.Struct):
+        """Typed request payload; encodes without dict introspection."""
+
+        model: str
+        messages: list[ChatMessage]
+
+try:
+    import urllib3
+except ImportError:  # pragma: no cover - optional dependency
+    urllib3 = None
+
+from ralph_wiggum.state import StateStore
+
+# Everything a chat round-trip can raise across the optional
+# transports: urllib3's hierarchy roots at HTTPError (not OSError), and
+# msgspec's DecodeError is likewise its own branch.
+_CHAT_ERRORS: tuple[type[Exception], ...] = (OSError, ValueError)
+if urllib3 is not None:
+    _CHAT_ERRORS += (urllib3.exceptions.HTTPError,)
+if msgspec is not None:
+    _CHAT_ERRORS += (msgspec.DecodeError,)
+
+
+def _encode_chat_request(model: str, messages: list[dict[str, str]]) -> bytes:
+    """Encode the chat payload, preferring the typed msgspec fast path."""
+    if msgspec is not None:
+        return msgspec.json.encode(
+            ChatRequest(
+                model=model,
+                messages=[ChatMessage(**message) for message in messages],
+            )
+        )
+    if orjson is not None:
+        return orjson.dumps({"model": model, "messages": messages})
+    return json.dumps({"model": model, "messages": messages}).encode("utf-8")
+
+
+def _decode_json(data: bytes) -> Any:
+    # Callers walk the response as a mapping, so decode stays untyped;
+    # msgspec/orjson still beat stdlib json handily on bytes input.
+    if msgspec is not None:
+        return msgspec.json.decode(data)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+_SYSTEM_PROMPT = (
+    "You are a smart contract audit assistant. Summarize the supplied "
+    "signals and findings into a short prioritized narrative."
+)
+
+
+def _dump_artifact(path: Path, payload: Any) -> None:
+    """Serialize a machine-read artifact straight to its file handle.
+
+    Compact encoding by default; ``RALPH_DEBUG_ARTIFACTS=1`` switches to
+    indented output for human inspection.
+    """
+    with path.open("w") as fh:
+        if os.getenv("RALPH_DEBUG_ARTIFACTS") == "1":
+            json.dump(payload, fh, indent=2)
+        else:
+            json.dump(payload, fh)
+        fh.write("\n")
+
+
+@dataclass
+class LLMClient:
+    """Minimal chat-completion client for an OpenAI-compatible server."""
+
+    base_url: str
+    model: str
+    api_key: str | None = None
+    timeout_seconds: float = 30.0
+
+    def __post_init__(self) -> None:
+        # Keep-alive pool per client: synthesis is called per finding
+        # and per file, and without it every chat costs a fresh TCP+TLS
+        # handshake. Built here (not at import) so the pool honors the
+        # instance's timeout and only exists when a client does.
+        self._pool = (
+            urllib3.PoolManager(
+                maxsize=4,
+                timeout=urllib3.Timeout(
+                    connect=5, read=self.timeout_seconds
+                ),
+            )
+            if urllib3 is not None
+            else None
+        )
+
+    @classmethod
+    def from_env(cls) -> LLMClient | None:
+        """Build a client from LLM_* environment variables, if set."""
+        base_url = os.getenv("LLM_BASE_URL")
+        if not base_url:
+            return None
+        return cls(
+            base_url=base_url,
+            model=os.getenv("LLM_MODEL", "default"),
+            api_key=os.getenv("LLM_API_KEY"),
+        )
+
+    def chat(self, messages: list[dict[str, str]]) -> dict[str, Any]:
+        body = _encode_chat_request(self.model, messages)
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        url = f"{self.base_url.rstrip('/')}/v1/chat/completions"
+        if self._pool is not None:
+            response = self._pool.request(
+                "POST", url, body=body, headers=headers
+            )
+            return _decode_json(response.data)
+        req = urllib_request.Request(
+            url, data=body, headers=headers, method="POST"
+        )
+        with urllib_request.urlopen(req, timeout=self.timeout_seconds) as response:
+            return _decode_json(response.read())
+
+
+@dataclass
+class LLMSynthesis:
+    """Turns the accumulated audit context into a prose summary."""
+
+    state_store: StateStore
+    artifacts_dir: Path
+    client: LLMClient | None = None
+    offline_fixtures: Path | None = None
+
+    def __post_init__(self) -> None:
+        # Create the artifact directory once per agent lifetime instead
+        # of stat+mkdir on every summarize call.
+        self._llm_dir = self.artifacts_dir / "llm"
+        self._llm_dir.mkdir(parents=True, exist_ok=True)
+
+    def is_available(self) -> bool:
+        return self.client is not None or self.offline_fixtures is not None
+
+    def summarize(
+        self, context: dict[str, Any], state: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        if state is None:
+            with self.state_store.transaction() as state:
+                return self.summarize(context, state)
+        result = self.compute(context)
+        state["llm_synthesis"] = result
+        return result
+
+    async def run_async(self, context: dict[str, Any]) -> dict[str, Any]:
+        return await asyncio.to_thread(self.compute, context)
+
+    def compute(self, context: dict[str, Any]) -> dict[str, Any]:
+        """Produce the summary result without touching the state store."""
+        # Check availability before anything else: when the LLM is
+        # disabled, serializing a multi-MB context and writing the
+        # request artifact would be pure waste.
+        if not self.is_available():
+            return {"status": "unavailable", "summary": None}
+
+        llm_dir = self._llm_dir
+        messages = [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(context)},
+        ]
+        request_path = llm_dir / "llm_request.json"
+        _dump_artifact(request_path, {"messages": messages})
+
+        if self.offline_fixtures is not None:
+            response = self._load_fixture()
+        else:
+            try:
+                response = self.client.chat(messages)
+            except _CHAT_ERRORS as exc:
+                _dump_artifact(llm_dir / "llm_error.json", {"error": str(exc)})
+                return {"status": "error", "summary": None}
+
+        if response is None:
+            return {"status": "unavailable", "summary": None}
+
+        response_path = llm_dir / "llm_response.json"
+        _dump_artifact(response_path, response)
+        return {
+            "status": "ok",
+            "summary": self._extract_summary(response),
+            "artifacts": [str(request_path), str(response_path)],
+        }
+
+    def _load_fixture(self) -> dict[str, Any] | None:
+        """First fixture (sorted by name) from the offline directory."""
+        fixtures = sorted(
+            path
+            for path in self.offline_fixtures.iterdir()
+            if path.suffix == ".json"
+        )
+        if not fixtures:
+            return None
+        with fixtures[0].open("rb") as fh:
+            return json.load(fh)
+
+    @staticmethod
+    def _extract_summary(response: dict[str, Any]) -> str | None:
+        choices = response.get("choices") or []
+        if not choices:
+            return None
+        return (choices[0].get("message") or {}).get("content")
@@ -0,0 +1,58 @@
+"""Concurrent agent execution.
+
+The agents are independent — each reads shared context and writes its
+own state key — so the I/O-bound ones can run under one event loop and
+be merged into the state with a single save, avoiding both sequential
+latency and lost-update races from per-agent saves.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+from ralph_wiggum.state import StateStore
+
+
+async def run_all(
+    state_store: StateStore,
+    *,
+    graph_analysis: Any = None,
+    slither_json: dict[str, Any] | None = None,
+    fuzz_agent: Any = None,
+    target_path: Path | None = None,
+    proof_agent: Any = None,
+    repair_agent: Any = None,
+    llm_synthesis: Any = None,
+    context: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Run the supplied agents concurrently and save the state once.
+
+    Returns the merged state. Agents are optional; pass only the ones
+    that should participate in this cycle.
+    """
+    state = state_store.load()
+    keys: list[str] = []
+    tasks = []
+    if graph_analysis is not None:
+        keys.append("graph_analysis")
+        tasks.append(graph_analysis.run_async(slither_json or {}))
+    if fuzz_agent is not None:
+        keys.append("fuzz_agent")
+        tasks.append(fuzz_agent.run_async(state, target_path))
+    if proof_agent is not None:
+        keys.append("proofs")
+        tasks.append(proof_agent.run_async(state))
+    if repair_agent is not None:
+        keys.append("repair")
+        tasks.append(repair_agent.run_async(state))
+    if llm_synthesis is not None:
+        keys.append("llm_synthesis")
+        tasks.append(llm_synthesis.run_async(context or {}))
+
+    results = await asyncio.gather(*tasks)
+    for key, result in zip(keys, results):
+        state[key] = result
+    state_store.save(state)
+    return state
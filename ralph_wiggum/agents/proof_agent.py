@@ -0,0 +1,76 @@
+"""Proof agent: emits proof-of-concept test stubs for the top findings."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ralph_wiggum.state import StateStore
+
+_STUB_TEMPLATE = (
+    "// Proof-of-concept stub for finding #{index}\n"
+    "// category: {category}\n"
+    "// check: {check}\n"
+    "// description: {description}\n"
+    "// TODO: turn this stub into an executable forge test\n"
+).format
+
+
+@dataclass
+class ProofAgent:
+    """Writes one forge-test stub per top-ranked static finding."""
+
+    state_store: StateStore
+    artifacts_dir: Path
+    top_n: int = 3
+
+    def __post_init__(self) -> None:
+        # Create the artifact directory once per agent lifetime instead
+        # of stat+mkdir on every run.
+        self._proofs_dir = self.artifacts_dir / "proofs"
+        self._proofs_dir.mkdir(parents=True, exist_ok=True)
+
+    def compute(self, state: dict[str, Any]) -> dict[str, Any]:
+        """Produce this agent's result without touching the state store."""
+        findings = (state.get("static_scan") or {}).get("findings") or []
+        proofs_dir = self._proofs_dir
+
+        # Render everything up front (pre-encoded bytes, so write_bytes
+        # skips the text-mode encoding step), then issue the writes
+        # through a small thread pool — tiny files, purely I/O-bound.
+        pending: list[tuple[Path, bytes]] = []
+        for index, finding in enumerate(findings[: self.top_n]):
+            category = finding.get("category") or "unknown"
+            content = _STUB_TEMPLATE(
+                index=index,
+                category=category,
+                check=finding.get("check") or "unknown",
+                description=finding.get("description") or "",
+            ).encode("utf-8")
+            pending.append((proofs_dir / f"proof_{index}_{category}.t.sol", content))
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(8, len(pending))) as pool:
+                futures = [
+                    pool.submit(file_path.write_bytes, content)
+                    for file_path, content in pending
+                ]
+                # Collect every result so a failed write (ENOSPC,
+                # permissions) surfaces instead of dying on a dropped
+                # Future while the proof path is still reported.
+                for future in futures:
+                    future.result()
+        return {"status": "ok", "proofs": [str(path) for path, _ in pending]}
+
+    def run(self, state: dict[str, Any] | None = None) -> dict[str, Any]:
+        if state is None:
+            with self.state_store.transaction() as state:
+                return self.run(state)
+        result = self.compute(state)
+        state["proofs"] = result
+        return result
+
+    async def run_async(self, state: dict[str, Any]) -> dict[str, Any]:
+        return await asyncio.to_thread(self.compute, state)
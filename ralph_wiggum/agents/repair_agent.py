@@ -0,0 +1,77 @@
+"""Repair agent: proposes canned remediations for known signal categories."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ralph_wiggum.state import StateStore
+
+_SUGGESTIONS = {
+    "reentrancy": (
+        "Apply checks-effects-interactions ordering or a reentrancy guard "
+        "before any external call."
+    ),
+    "unchecked_return": (
+        "Check the return value of low-level calls and revert on failure."
+    ),
+    "dangerous_call": (
+        "Avoid delegatecall/low-level calls to addresses that are not "
+        "strictly controlled; validate targets against an allowlist."
+    ),
+}
+
+
+@dataclass
+class RepairAgent:
+    """Writes a repair plan for the signal categories the scan raised."""
+
+    state_store: StateStore
+    artifacts_dir: Path
+
+    def __post_init__(self) -> None:
+        # Read once: the env lookup and int parse don't belong in the
+        # per-call precondition check. Same for the artifact directory.
+        self._min_budget = int(os.getenv("REPAIR_MIN_BUDGET", "1"))
+        self._repair_dir = self.artifacts_dir / "repair"
+        self._repair_dir.mkdir(parents=True, exist_ok=True)
+
+    def _has_budget(self, state: dict[str, Any]) -> bool:
+        budget = state.get("budget") or {}
+        cap = budget.get("cap")
+        if cap is None:
+            return True
+        return cap - budget.get("spent", 0) >= self._min_budget
+
+    def compute(self, state: dict[str, Any]) -> dict[str, Any]:
+        """Produce this agent's result without touching the state store."""
+        if not self._has_budget(state):
+            return {"status": "skipped", "reason": "budget exhausted"}
+        signals = (state.get("static_scan") or {}).get("signals") or {}
+        suggestions = [
+            {"category": category, "suggestion": _SUGGESTIONS[category]}
+            for category, count in signals.items()
+            if count and category in _SUGGESTIONS
+        ]
+        plan_path = self._repair_dir / "repair_plan.json"
+        plan_path.write_text(json.dumps({"suggestions": suggestions}) + "\n")
+        return {
+            "status": "ok",
+            "suggestions": len(suggestions),
+            "plan": str(plan_path),
+        }
+
+    def run(self, state: dict[str, Any] | None = None) -> dict[str, Any]:
+        if state is None:
+            with self.state_store.transaction() as state:
+                return self.run(state)
+        result = self.compute(state)
+        state["repair"] = result
+        return result
+
+    async def run_async(self, state: dict[str, Any]) -> dict[str, Any]:
+        return await asyncio.to_thread(self.compute, state)
@@ -0,0 +1,231 @@
+"""Solodit signal enrichment.
+
+Maps static-scan signal categories onto Solodit's public audit-finding
+corpus. Matches are heuristic only — they raise reviewer attention and
+are never treated as proven vulnerabilities.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib import request as urllib_request
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import urllib3
+except ImportError:  # pragma: no cover - optional dependency
+    urllib3 = None
+
+from ralph_wiggum.jsonio import dump_json, load_json
+from ralph_wiggum.scoring import collect_findings
+from ralph_wiggum.state import StateStore
+
+# Failures an enrichment round-trip can raise: urllib's URLError is an
+# OSError, but the pooled urllib3 transport roots its hierarchy at
+# HTTPError, which is neither.
+_ENRICH_ERRORS: tuple[type[Exception], ...] = (OSError, ValueError)
+if urllib3 is not None:
+    _ENRICH_ERRORS += (urllib3.exceptions.HTTPError,)
+
+
+@dataclass
+class SoloditClient:
+    """Minimal POST client for the Solodit enrichment endpoint.
+
+    Enrichment is called repeatedly within a run, so the client keeps a
+    keep-alive connection pool (when urllib3 is available) instead of
+    paying a fresh TCP+TLS handshake per call.
+    """
+
+    base_url: str
+    api_key: str | None = None
+    timeout_seconds: float = 10.0
+
+    def __post_init__(self) -> None:
+        # URL and headers never change after construction; build once.
+        self._url = f"{self.base_url.rstrip('/')}/v1/enrich"
+        self._headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            self._headers["Authorization"] = f"Bearer {self.api_key}"
+        self._pool = (
+            urllib3.PoolManager(
+                maxsize=16,
+                timeout=urllib3.Timeout(
+                    connect=5, read=self.timeout_seconds
+                ),
+            )
+            if urllib3 is not None
+            else None
+        )
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.clear()
+
+    def __enter__(self) -> SoloditClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def enrich(self, payload: dict[str, Any]) -> dict[str, Any]:
+        # orjson emits and consumes bytes directly, skipping the
+        # str-encode on the way out and the decode on the way back; the
+        # explicit Content-Length avoids urllib's chunked fallback.
+        if orjson is not None:
+            body = orjson.dumps(payload)
+        else:
+            body = json.dumps(payload).encode("utf-8")
+        headers = {**self._headers, "Content-Length": str(len(body))}
+        if self._pool is not None:
+            response = self._pool.request(
+                "POST", self._url, body=body, headers=headers
+            )
+            raw = response.data
+        else:
+            req = urllib_request.Request(
+                self._url, data=body, headers=headers, method="POST"
+            )
+            with urllib_request.urlopen(
+                req, timeout=self.timeout_seconds
+            ) as response:
+                raw = response.read()
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+
+@dataclass
+class SoloditSignalBooster:
+    """Attaches unverified Solodit heuristics to the scanned signals."""
+
+    # Constant part of every match record, merged via dict-unpacking so
+    # the per-category loop does a single C-level construction.
+    _TEMPLATE = {
+        "source": "solodit",
+        "status": "unverified",
+        "confidence": "low",
+        "disclaimer": "External heuristic match; not a proven vulnerability.",
+    }
+
+    state_store: StateStore
+    artifacts_dir: Path
+    client: SoloditClient | None = None
+    offline_fixtures: Path | None = None
+    use_cache: bool = True
+    cache_ttl_seconds: float = 24 * 3600.0
+
+    def enrich(
+        self,
+        state: dict[str, Any] | None = None,
+        *,
+        findings: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        if state is None:
+            with self.state_store.transaction() as state:
+                return self.enrich(state, findings=findings)
+        static_scan = state.get("static_scan") or {}
+        signals = static_scan.get("signals") or {}
+        evidence = static_scan.get("evidence") or []
+
+        # Loop invariants bound once: the evidence count never changes
+        # per match, and the items view is materialized a single time.
+        evidence_count = len(evidence)
+        items = signals.items() if isinstance(signals, dict) else ()
+        template = self._TEMPLATE
+        matches = [
+            {
+                **template,
+                "category": category,
+                "count": count,
+                "evidence_count": evidence_count,
+                "label": f"heuristic:{category}",
+            }
+            for category, count in items
+            if count
+        ]
+
+        solodit_dir = self.artifacts_dir / "solodit"
+        solodit_dir.mkdir(parents=True, exist_ok=True)
+        # Callers that already collected the findings (the kernel's
+        # solodit stage does) can inject them instead of having the
+        # state re-walked here.
+        if findings is None:
+            findings = collect_findings(state)
+        payload = {
+            "signals": signals,
+            "matches": matches,
+            "findings": findings,
+        }
+        dump_json(solodit_dir / "solodit_request.json", payload, pretty=False)
+
+        # Enrichment is deterministic for a given payload, so live
+        # responses are memoized on disk; an unchanged scan skips the
+        # network round-trip entirely on the next run.
+        cache_file = None
+        if self.use_cache and self.client is not None:
+            key = hashlib.blake2b(
+                json.dumps(payload, sort_keys=True).encode(), digest_size=16
+            ).hexdigest()
+            cache_dir = solodit_dir / "cache"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = cache_dir / f"{key}.json"
+
+        response = None
+        status = "offline"
+        if self.offline_fixtures is not None:
+            response = self._load_fixture()
+            status = "fixture" if response is not None else "offline"
+        elif (
+            cache_file is not None
+            and cache_file.exists()
+            and time.time() - cache_file.stat().st_mtime < self.cache_ttl_seconds
+        ):
+            response = load_json(cache_file)
+            status = "cached"
+        elif self.client is not None:
+            try:
+                response = self.client.enrich(payload)
+                status = "ok"
+            except _ENRICH_ERRORS as exc:
+                dump_json(
+                    solodit_dir / "solodit_error.json",
+                    {"error": str(exc)},
+                    pretty=False,
+                )
+                status = "error"
+            if status == "ok" and cache_file is not None:
+                dump_json(cache_file, response, pretty=False)
+        if response is not None:
+            dump_json(solodit_dir / "solodit_response.json", response, pretty=False)
+
+        result = {"status": status, "matches": matches, "response": response}
+        state["solodit"] = result
+        return result
+
+    def _load_fixture(self) -> dict[str, Any] | None:
+        """First fixture (by name) from the offline directory.
+
+        Tracks the minimum name in one scandir pass instead of building
+        Path objects for every entry and sorting the whole list.
+        """
+        best: str | None = None
+        with os.scandir(self.offline_fixtures) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and (
+                    best is None or entry.name < best
+                ):
+                    best = entry.name
+        if best is None:
+            return None
+        return load_json(self.offline_fixtures / best)
@@ -0,0 +1,232 @@
+"""Static scan agent.
+
+Drives slither plus the quick linters through the runner pool, folds the
+detector output into signal counts / findings / evidence, and decides
+whether the run should escalate to the heavier agents.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import operator
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+from ralph_wiggum.state import StateStore
+from ralph_wiggum.tools.runners import (
+    QuickLinterRunner,
+    RunnerPool,
+    SlitherRunner,
+    ToolJob,
+    ToolResult,
+)
+
+if msgspec is not None:
+    # Struct records store their fields in a C array — roughly half the
+    # memory of an equivalent dict and faster to build in the hot
+    # extraction loop. They are converted to builtins in one pass at
+    # the end so the shared state keeps its plain-dict schema.
+
+    class Finding(msgspec.Struct):
+        """One classified detector hit."""
+
+        category: str
+        check: str | None
+        description: str | None
+        impact: str | None
+        confidence: str
+        source_tool: str
+        artifact_paths: tuple[str, ...]
+
+    class Evidence(msgspec.Struct):
+        """One source location backing a finding."""
+
+        category: str
+        check: str | None
+        description: str | None
+        path: str | None
+        lines: list[int] | None
+
+    _finding_record = Finding
+    _evidence_record = Evidence
+else:
+
+    def _finding_record(**fields: Any) -> dict[str, Any]:
+        return fields
+
+    def _evidence_record(**fields: Any) -> dict[str, Any]:
+        return fields
+
+_DEFAULT_THRESHOLDS = {
+    "reentrancy": 1,
+    "unchecked_return": 2,
+    "dangerous_call": 3,
+}
+
+# Read-only empty-mapping sentinel for detectors without source
+# mappings; sharing it avoids allocating a fresh dict per element.
+_EMPTY_MAP: dict[str, Any] = {}
+
+# One C-level scan classifies a detector check; the matched group name
+# is the signal category, replacing a ladder of lower()+substring tests.
+_CHECK_RE = re.compile(
+    r"(?P<reentrancy>reentrancy)"
+    r"|(?P<unchecked_return>unchecked)"
+    r"|(?P<dangerous_call>delegatecall|low-level|call)",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class StaticScan:
+    """Runs the static tooling and publishes signals into the state."""
+
+    state_store: StateStore
+    slither_runner: SlitherRunner
+    quick_linters: list[QuickLinterRunner] = field(default_factory=list)
+    runner_pool: RunnerPool | None = None
+    thresholds: dict[str, int] = field(
+        default_factory=lambda: dict(_DEFAULT_THRESHOLDS)
+    )
+
+    def __post_init__(self) -> None:
+        # Thresholds are fixed after construction; freeze them into a
+        # tuple once so the per-scan escalation check iterates a
+        # read-only structure instead of a dict view.
+        self._threshold_items = tuple(self.thresholds.items())
+
+    def run(
+        self, target_path: Path, state: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        if state is None:
+            with self.state_store.transaction() as state:
+                return self.run(target_path, state)
+        tool_results = self._run_tools(target_path)
+        slither_payload: dict[str, Any] = {}
+        linter_results = []
+        for tool_result in tool_results:
+            if tool_result.name == "slither":
+                slither_payload = tool_result.payload
+            else:
+                linter_results.append(tool_result)
+        # Stream detectors from disk rather than holding the whole
+        # slither report; _extract_signals only needs one at a time.
+        signals, findings, evidence = self._extract_signals(
+            self.slither_runner.iter_detectors()
+        )
+        pool = self.runner_pool or RunnerPool()
+        findings.extend(pool.merge_findings(linter_results))
+        findings = self._sort_findings(findings)
+        result = {
+            "signals": signals,
+            "findings": findings,
+            "evidence": evidence,
+            "escalate": self._should_escalate(signals),
+            "slither_status": slither_payload.get("status", "skipped"),
+        }
+        state["static_scan"] = result
+        return result
+
+    def _run_tools(self, target_path: Path) -> list[ToolResult]:
+        # Slither and the linters are independent subprocess/IO work, so
+        # fan them out on one event loop by default; an explicitly
+        # sequential pool opts back into ordered execution.
+        if self.runner_pool is None or self.runner_pool.parallel:
+            return asyncio.run(self._run_tools_async(target_path))
+        jobs = [
+            ToolJob("slither", lambda: self.slither_runner.run(target_path))
+        ]
+        for linter in self.quick_linters:
+            jobs.append(
+                ToolJob(linter.name, lambda lint=linter: lint.run(target_path))
+            )
+        return self.runner_pool.run(jobs)
+
+    async def _run_tools_async(self, target_path: Path) -> list[ToolResult]:
+        names = ["slither"]
+        coros = [asyncio.to_thread(self.slither_runner.run, target_path)]
+        for linter in self.quick_linters:
+            names.append(linter.name)
+            coros.append(asyncio.to_thread(linter.run, target_path))
+        payloads = await asyncio.gather(*coros)
+        results = [
+            ToolResult(name, payload)
+            for name, payload in zip(names, payloads)
+        ]
+        results.sort(key=lambda result: result.name)
+        return results
+
+    def _extract_signals(
+        self, detectors: Iterable[dict[str, Any]]
+    ) -> tuple[dict[str, int], list[dict[str, Any]], list[dict[str, Any]]]:
+        counts = {"reentrancy": 0, "unchecked_return": 0, "dangerous_call": 0}
+        findings: list[dict[str, Any]] = []
+        evidence: list[dict[str, Any]] = []
+        search = _CHECK_RE.search
+        # One immutable tuple shared by every finding, instead of a
+        # fresh two-element list (plus Path arithmetic) per detector.
+        artifact_paths = tuple(self._artifact_paths())
+        for detector in detectors:
+            match = search(detector.get("check") or "")
+            if match is None:
+                continue
+            category = match.lastgroup
+            check = detector.get("check")
+            description = detector.get("description")
+            counts[category] += 1
+            findings.append(
+                _finding_record(
+                    category=category,
+                    check=check,
+                    description=description,
+                    impact=detector.get("impact"),
+                    confidence=detector.get("confidence") or "unknown",
+                    source_tool="slither",
+                    artifact_paths=artifact_paths,
+                )
+            )
+            for element in detector.get("elements") or ():
+                source = element.get("source_mapping") or _EMPTY_MAP
+                evidence.append(
+                    _evidence_record(
+                        category=category,
+                        check=check,
+                        description=description,
+                        path=source.get("filename_absolute")
+                        or source.get("filename"),
+                        lines=source.get("lines"),
+                    )
+                )
+        if msgspec is not None:
+            # One C-level conversion back to the plain-dict state schema.
+            findings = msgspec.to_builtins(findings)
+            evidence = msgspec.to_builtins(evidence)
+        return counts, findings, evidence
+
+    def _artifact_paths(self) -> list[str]:
+        return [
+            self.slither_runner.slither_json_path,
+            self.slither_runner.slither_log_path,
+        ]
+
+    @staticmethod
+    def _sort_findings(findings: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        # Schwartzian transform: compute each key once up front so the
+        # sort itself compares plain tuples at C speed.
+        key = RunnerPool._finding_sort_key
+        keyed = [(key(finding), finding) for finding in findings]
+        keyed.sort(key=operator.itemgetter(0))
+        return [finding for _, finding in keyed]
+
+    def _should_escalate(self, signals: dict[str, int]) -> bool:
+        return any(
+            signals.get(category, 0) >= threshold
+            for category, threshold in self._threshold_items
+        )
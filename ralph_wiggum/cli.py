@@ -0,0 +1,274 @@
+"""Command-line interface for the audit pipeline.
+
+Subcommands map onto the main workflows: full audits, report replays,
+scoreboards, cross-run trends, and the single-file workbench helpers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Only the cheap imports stay at module scope; each subcommand imports
+# its own heavyweight modules on entry so `ralph score ...` never pays
+# for the kernel's agent stack (and vice versa).
+from ralph_wiggum.jsonio import dump_json, load_json
+from ralph_wiggum.state import StateStore, resolve_run_paths
+
+
+def run_audit(target: Path, run_dir: Path, no_cache: bool = False) -> None:
+    from ralph_wiggum.kernel import Kernel
+
+    run_dir.mkdir(parents=True, exist_ok=True)
+    artifacts_dir = run_dir / "artifacts"
+    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    kernel = Kernel(
+        state_store=StateStore(run_dir / "state.json"),
+        artifacts_dir=artifacts_dir,
+        target_path=target,
+        solodit_cache=not no_cache,
+    )
+    state = kernel.run()
+    print(f"audit finished: status={state.get('status')}")
+
+
+def run_replay(run_dir: Path, pretty: bool = False) -> None:
+    from ralph_wiggum.reporting import ReportGenerator
+
+    state_path, artifacts_dir = resolve_run_paths(run_dir)
+    state_store = StateStore(state_path)
+    state = state_store.load()
+    report_path = ReportGenerator(state_store, artifacts_dir).write_report(state)
+    summary = {
+        "run": str(run_dir),
+        "status": state.get("status"),
+        "report": str(report_path),
+    }
+    dump_json(run_dir / "replay_summary.json", summary, pretty=pretty)
+    print(f"replayed report: {report_path}")
+
+
+def run_score(run_dir: Path, pretty: bool = False) -> None:
+    from ralph_wiggum.scoring import Scorer
+
+    state_path, artifacts_dir = resolve_run_paths(run_dir)
+    state_store = StateStore(state_path)
+    state = state_store.load()
+    scorer = Scorer()
+    scoreboard = scorer.build_scoreboard(state, run_root=run_dir)
+    markdown = scorer.format_scoreboard_markdown(scoreboard)
+    # The JSON and markdown artifacts are independent; overlap the two
+    # blocking writes before the final state save.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        json_write = pool.submit(
+            dump_json, run_dir / "scoreboard.json", scoreboard, pretty
+        )
+        md_write = pool.submit((run_dir / "scoreboard.md").write_text, markdown)
+        json_write.result()
+        md_write.result()
+    state["scoreboard"] = scoreboard
+    state_store.save(state)
+    print(f"scored {scoreboard['total']} findings")
+
+
+def run_trend(runs_dir: Path, pretty: bool = False) -> None:
+    from ralph_wiggum.scoring import Scorer
+
+    run_dirs = sorted(d for d in runs_dir.iterdir() if d.is_dir())
+    scorer = Scorer()
+    entries = []
+    previous_scores: dict[str, int] = {}
+    previous_ids: set[str] = set()
+    # Load every run's state up front and in parallel: the IO+parse is
+    # independent per run, only the scoreboard chaining is sequential.
+    loadable = [
+        run_dir
+        for run_dir in run_dirs
+        if (run_dir / "state.json").exists()
+    ]
+    if not loadable:
+        states = []
+    else:
+        with ThreadPoolExecutor(max_workers=min(8, len(loadable))) as pool:
+            states = list(
+                pool.map(lambda d: load_json(d / "state.json"), loadable)
+            )
+    for run_dir, state in zip(loadable, states):
+        scoreboard = scorer.build_scoreboard(
+            state, run_root=run_dir, previous_scores=previous_scores
+        )
+        current_ids = {
+            entry["finding_id"] for entry in scoreboard["entries"]
+        }
+        summary = {
+            "new": len(current_ids - previous_ids),
+            "resolved": len(previous_ids - current_ids),
+            "regressed": sum(
+                1
+                for entry in scoreboard["entries"]
+                if entry["previous_score"] is not None
+                and entry["score_total"] > entry["previous_score"]
+            ),
+        }
+        entries.append(
+            {
+                "run": run_dir.name,
+                "total": scoreboard["total"],
+                "summary": summary,
+            }
+        )
+        previous_scores = {
+            entry["finding_id"]: entry["score_total"]
+            for entry in scoreboard["entries"]
+        }
+        previous_ids = current_ids
+    trend = {"runs": entries}
+    markdown = _format_trend_markdown(entries).encode("utf-8")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        json_write = pool.submit(dump_json, runs_dir / "trend.json", trend, pretty)
+        md_write = pool.submit((runs_dir / "trend.md").write_bytes, markdown)
+        json_write.result()
+        md_write.result()
+    print(f"trend over {len(entries)} runs")
+
+
+# Bound once at import; the per-run loop then only fills placeholders
+# instead of building a fresh f-string per entry.
+_TREND_LINE = (
+    "- {run}: total={total} new={new} resolved={resolved}"
+    " regressed={regressed}"
+).format
+
+
+def _format_trend_markdown(entries: list[dict]) -> str:
+    if not entries:
+        return "# Finding trend\n\n- no runs found\n"
+    body = "\n".join(
+        _TREND_LINE(run=entry["run"], total=entry["total"], **entry["summary"])
+        for entry in entries
+    )
+    return f"# Finding trend\n\n{body}\n"
+
+
+def run_entrypoints(file: Path, run_dir: Path) -> None:
+    from ralph_wiggum.workbench import Workbench
+
+    _, artifacts_dir = resolve_run_paths(run_dir)
+    workbench = Workbench(artifacts_dir)
+    print(json.dumps(workbench.entrypoints(file), indent=2))
+
+
+def run_workbench(file: Path, run_dir: Path) -> None:
+    from ralph_wiggum.workbench import Workbench
+
+    _, artifacts_dir = resolve_run_paths(run_dir)
+    workbench = Workbench(artifacts_dir)
+    result = workbench.analyze(file)
+    print(json.dumps({"status": result.get("status")}, indent=2))
+
+
+def run_diff_review(
+    run_dir: Path, repo: Path, base_ref: str, head_ref: str
+) -> None:
+    from ralph_wiggum.agents.diff_review import DifferentialReview
+
+    state_path, artifacts_dir = resolve_run_paths(run_dir)
+    review = DifferentialReview(
+        state_store=StateStore(state_path),
+        artifacts_dir=artifacts_dir,
+        repo_path=repo,
+        slither_json_path=artifacts_dir / "slither.json",
+    )
+    report = review.run(base_ref, head_ref)
+    delta = report["delta"]
+    print(
+        f"resolved={len(delta['resolved'])}"
+        f" regressed={len(delta['regressed'])}"
+        f" unchanged={len(delta['unchanged'])}"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="ralph")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    audit = subparsers.add_parser("audit", help="run a full audit")
+    audit.add_argument("target", type=Path)
+    audit.add_argument("run_dir", type=Path)
+    audit.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="bypass the on-disk Solodit response cache",
+    )
+    audit.set_defaults(
+        func=lambda args: run_audit(
+            args.target, args.run_dir, no_cache=args.no_cache
+        )
+    )
+
+    pretty_help = "indent JSON artifacts for human inspection"
+
+    replay = subparsers.add_parser("replay", help="regenerate a run's report")
+    replay.add_argument("run_dir", type=Path)
+    replay.add_argument("--pretty", action="store_true", help=pretty_help)
+    replay.set_defaults(
+        func=lambda args: run_replay(args.run_dir, pretty=args.pretty)
+    )
+
+    score = subparsers.add_parser("score", help="build a run's scoreboard")
+    score.add_argument("run_dir", type=Path)
+    score.add_argument("--pretty", action="store_true", help=pretty_help)
+    score.set_defaults(
+        func=lambda args: run_score(args.run_dir, pretty=args.pretty)
+    )
+
+    trend = subparsers.add_parser("trend", help="finding trend across runs")
+    trend.add_argument("runs_dir", type=Path)
+    trend.add_argument("--pretty", action="store_true", help=pretty_help)
+    trend.set_defaults(
+        func=lambda args: run_trend(args.runs_dir, pretty=args.pretty)
+    )
+
+    entrypoints = subparsers.add_parser(
+        "entrypoints", help="list a file's entry points"
+    )
+    entrypoints.add_argument("file", type=Path)
+    entrypoints.add_argument("run_dir", type=Path)
+    entrypoints.set_defaults(
+        func=lambda args: run_entrypoints(args.file, args.run_dir)
+    )
+
+    workbench = subparsers.add_parser(
+        "workbench", help="single-file slither analysis"
+    )
+    workbench.add_argument("file", type=Path)
+    workbench.add_argument("run_dir", type=Path)
+    workbench.set_defaults(
+        func=lambda args: run_workbench(args.file, args.run_dir)
+    )
+
+    diff_review = subparsers.add_parser(
+        "diff-review", help="differential review between two refs"
+    )
+    diff_review.add_argument("run_dir", type=Path)
+    diff_review.add_argument("repo", type=Path)
+    diff_review.add_argument("base_ref")
+    diff_review.add_argument("head_ref")
+    diff_review.set_defaults(
+        func=lambda args: run_diff_review(
+            args.run_dir, args.repo, args.base_ref, args.head_ref
+        )
+    )
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""JSON artifact helpers.
+
+Writers prefer orjson (Rust encoder, emits bytes directly) and fall back
+to stdlib json so the pipeline keeps working without the optional
+dependency.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dump_json(path: Path, obj: Any, pretty: bool = True) -> None:
+    """Serialize ``obj`` to ``path`` with the fastest available encoder."""
+    if orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        path.write_bytes(orjson.dumps(obj, option=option))
+        return
+    if pretty:
+        path.write_text(json.dumps(obj, indent=2) + "\n")
+    else:
+        path.write_text(json.dumps(obj) + "\n")
+
+
+def load_json(path: Path) -> Any:
+    """Parse JSON from ``path``; orjson consumes the bytes directly."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text())
@@ -0,0 +1,377 @@
+"""Kernel: orchestrates one full audit run.
+
+Runs the agents in dependency order (static scan first, then the
+analysis and synthesis agents), records which capabilities executed or
+were skipped, and finishes by writing the markdown report.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from ralph_wiggum.state import CapabilityRecord, StateStore, validate_state
+
+if TYPE_CHECKING:
+    from ralph_wiggum.agents.llm_synthesis import LLMClient
+
+# The agent and runner modules are imported inside the stage that uses
+# them, not at module scope: importing Kernel (CLI --help, dry runs,
+# tests) would otherwise pay for every agent's dependency tree even
+# when gating skips most stages.
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class _TimedStage:
+    """Captures a stage's start/finish timestamps around its body.
+
+    Each timestamp is taken exactly once; the ``datetime.now`` syscall
+    plus ISO formatting previously ran twice per capability record.
+    """
+
+    started_at: str
+    finished_at: str
+
+    def __enter__(self) -> _TimedStage:
+        self.started_at = _now_iso()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.finished_at = _now_iso()
+
+
+@dataclass
+class Kernel:
+    """Drives the full agent pipeline for a single target."""
+
+    state_store: StateStore
+    artifacts_dir: Path
+    target_path: Path
+    llm_client: LLMClient | None = None
+    offline_fixtures: Path | None = None
+    budget_cap: int = 10
+    solodit_cache: bool = True
+    _merge_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    @staticmethod
+    def _capability_seen(
+        capabilities: dict[str, Any]
+    ) -> dict[str, set[tuple[str, str | None]]]:
+        """In-memory (name, reason) index over the capability buckets.
+
+        Kept under ``_seen`` so de-dup is a set probe instead of a
+        linear scan of entry dicts per record; the key never reaches
+        disk (StateStore strips it at encode time). Seeded from any
+        entries already present when the state was loaded from a
+        previous run.
+        """
+        seen = capabilities.get("_seen")
+        if seen is None:
+            seen = capabilities["_seen"] = {
+                bucket: {
+                    (entry["name"], entry.get("reason"))
+                    for entry in capabilities.get(bucket, [])
+                }
+                for bucket in ("executed", "skipped")
+            }
+        return seen
+
+    @classmethod
+    def _record_capability(
+        cls,
+        state: dict[str, Any],
+        bucket: str,
+        name: str,
+        reason: str | None = None,
+        started_at: str | None = None,
+        finished_at: str | None = None,
+    ) -> None:
+        capabilities = state.setdefault(
+            "capabilities", {"executed": [], "skipped": []}
+        )
+        key = (name, reason)
+        seen = cls._capability_seen(capabilities)
+        if key in seen[bucket]:
+            return
+        seen[bucket].add(key)
+        # Built as a typed record, flattened at the state boundary so
+        # the persisted JSON schema stays a plain mapping.
+        capabilities[bucket].append(
+            CapabilityRecord(
+                name=name,
+                reason=reason,
+                started_at=started_at,
+                finished_at=finished_at,
+            ).as_dict()
+        )
+
+    @cached_property
+    def _llm_min_budget(self) -> int:
+        # The threshold can't change mid-run; read and parse the
+        # environment once per kernel instead of per budget check.
+        return int(os.getenv("LLM_MIN_BUDGET", "1"))
+
+    def _has_llm_budget(self, state: dict[str, Any]) -> bool:
+        minimum = self._llm_min_budget
+        budget = state.get("budget") or {}
+        cap = budget.get("cap")
+        if cap is None:
+            return True
+        return cap - budget.get("spent", 0) >= minimum
+
+    def run(self) -> dict[str, Any]:
+        # The kernel is the sole writer of the state file during a run,
+        # so one in-memory dict is threaded through every stage; each
+        # stage mutates it in place and the file is persisted once per
+        # agent boundary (where artifacts exist that the state should
+        # survive with) rather than reloaded and rewritten per mutation.
+        state = self.state_store.load()
+        state.setdefault("budget", {"cap": self.budget_cap, "spent": 0})
+        state["status"] = "running"
+        self.state_store.save(state)
+
+        # Each stage writes its own section plus a capability record;
+        # validation after the stage only re-checks those keys.
+        # static_scan and graph_analysis stay serialized (the graph
+        # depends on slither.json); solodit/fuzz/proof/repair write
+        # disjoint keys and fan out together, and llm_synthesis runs
+        # last because it reads their output.
+        for stage, touched in (
+            (self._run_static_scan, ("static_scan", "capabilities")),
+            (self._run_graph_analysis, ("graph_analysis", "capabilities")),
+        ):
+            stage(state)
+            self.state_store.save(state)
+            validate_state(state, changed_keys=touched)
+
+        touched = self._run_parallel_stages(
+            state,
+            (
+                (self._run_solodit, "solodit"),
+                (self._run_fuzz_agent, "fuzz_agent"),
+                (self._run_proof_agent, "proofs"),
+                (self._run_repair_agent, "repair"),
+            ),
+        )
+        self.state_store.save(state)
+        validate_state(state, changed_keys=touched)
+
+        self._run_llm_synthesis(state)
+        self.state_store.save(state)
+        validate_state(state, changed_keys=("llm_synthesis", "capabilities"))
+
+        # Deferred agents stay queued for a later run; record them so the
+        # report can show what was left on the table. Nothing ran, so
+        # one shared timestamp covers both ends of every record.
+        queued = state.get("agent_queue") or []
+        if queued:
+            ts = _now_iso()
+            for name in queued:
+                self._record_capability(
+                    state,
+                    "skipped",
+                    name,
+                    reason="queued",
+                    started_at=ts,
+                    finished_at=ts,
+                )
+
+        from ralph_wiggum.reporting import ReportGenerator
+
+        ReportGenerator(self.state_store, self.artifacts_dir).write_report(state)
+
+        state["status"] = "completed"
+        # Final dump is the one humans read back; indent it.
+        self.state_store.save(state, pretty=True)
+        validate_state(state)
+        return state
+
+    def _run_parallel_stages(
+        self,
+        state: dict[str, Any],
+        stages: tuple[tuple[Callable[[dict[str, Any]], None], str], ...],
+    ) -> tuple[str, ...]:
+        """Run independent stages concurrently and merge their writes.
+
+        Each stage gets a snapshot sharing the read-only sections but
+        with its own empty capabilities buckets, so threads never
+        mutate a shared container; the stage's declared write key and
+        its capability records are folded back under one lock.
+        """
+
+        def execute(
+            stage: Callable[[dict[str, Any]], None], write_key: str
+        ) -> None:
+            snapshot = dict(state)
+            snapshot["capabilities"] = {"executed": [], "skipped": []}
+            stage(snapshot)
+            with self._merge_lock:
+                if write_key in snapshot:
+                    state[write_key] = snapshot[write_key]
+                buckets = state.setdefault(
+                    "capabilities", {"executed": [], "skipped": []}
+                )
+                seen = self._capability_seen(buckets)
+                for bucket in ("executed", "skipped"):
+                    for entry in snapshot["capabilities"][bucket]:
+                        key = (entry["name"], entry.get("reason"))
+                        if key not in seen[bucket]:
+                            seen[bucket].add(key)
+                            buckets[bucket].append(entry)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [
+                pool.submit(execute, stage, write_key)
+                for stage, write_key in stages
+            ]
+            for future in futures:
+                future.result()
+        return tuple(write_key for _, write_key in stages) + ("capabilities",)
+
+    def _run_static_scan(self, state: dict[str, Any]) -> None:
+        from ralph_wiggum.agents.static_scan import StaticScan
+        from ralph_wiggum.tools.runners import QuickLinterRunner, SlitherRunner
+
+        scan = StaticScan(
+            self.state_store,
+            SlitherRunner(self.artifacts_dir),
+            quick_linters=[QuickLinterRunner(self.artifacts_dir)],
+        )
+        with _TimedStage() as stage:
+            scan.run(self.target_path, state)
+        self._record_capability(
+            state,
+            "executed",
+            "static_scan",
+            started_at=stage.started_at,
+            finished_at=stage.finished_at,
+        )
+        state["budget"]["spent"] = state["budget"].get("spent", 0) + 1
+
+    def _run_graph_analysis(self, state: dict[str, Any]) -> None:
+        slither_json_path = self.artifacts_dir / "slither.json"
+        if not slither_json_path.exists():
+            self._record_capability(
+                state, "skipped", "graph_analysis", reason="no slither.json"
+            )
+            return
+        from ralph_wiggum.agents.graph_analysis import GraphAnalysis
+
+        agent = GraphAnalysis(self.state_store, artifacts_dir=self.artifacts_dir)
+        # Streams the report sections it needs instead of the kernel
+        # materializing the whole slither.json blob here.
+        with _TimedStage() as stage:
+            agent.analyze_path(slither_json_path, state)
+        self._record_capability(
+            state,
+            "executed",
+            "graph_analysis",
+            started_at=stage.started_at,
+            finished_at=stage.finished_at,
+        )
+
+    def _run_solodit(self, state: dict[str, Any]) -> None:
+        from ralph_wiggum.agents.solodit import SoloditSignalBooster
+        from ralph_wiggum.scoring import collect_findings
+
+        booster = SoloditSignalBooster(
+            self.state_store,
+            self.artifacts_dir,
+            offline_fixtures=self.offline_fixtures,
+            use_cache=self.solodit_cache,
+        )
+        # The static scan already populated the findings; hand them over
+        # so enrich does not re-walk the state.
+        with _TimedStage() as stage:
+            booster.enrich(state, findings=collect_findings(state))
+        self._record_capability(
+            state,
+            "executed",
+            "solodit",
+            started_at=stage.started_at,
+            finished_at=stage.finished_at,
+        )
+
+    def _run_fuzz_agent(self, state: dict[str, Any]) -> None:
+        from ralph_wiggum.agents.fuzz_agent import FuzzAgent
+        from ralph_wiggum.tools.runners import FoundryRunner
+
+        agent = FuzzAgent(self.state_store, FoundryRunner(self.artifacts_dir))
+        with _TimedStage() as stage:
+            agent.run(self.target_path, state)
+        self._record_capability(
+            state,
+            "executed",
+            "fuzz_agent",
+            started_at=stage.started_at,
+            finished_at=stage.finished_at,
+        )
+
+    def _run_proof_agent(self, state: dict[str, Any]) -> None:
+        from ralph_wiggum.agents.proof_agent import ProofAgent
+
+        agent = ProofAgent(self.state_store, self.artifacts_dir)
+        with _TimedStage() as stage:
+            agent.run(state)
+        self._record_capability(
+            state,
+            "executed",
+            "proof_agent",
+            started_at=stage.started_at,
+            finished_at=stage.finished_at,
+        )
+
+    def _run_repair_agent(self, state: dict[str, Any]) -> None:
+        from ralph_wiggum.agents.repair_agent import RepairAgent
+
+        agent = RepairAgent(self.state_store, self.artifacts_dir)
+        with _TimedStage() as stage:
+            agent.run(state)
+        self._record_capability(
+            state,
+            "executed",
+            "repair_agent",
+            started_at=stage.started_at,
+            finished_at=stage.finished_at,
+        )
+
+    def _run_llm_synthesis(self, state: dict[str, Any]) -> None:
+        from ralph_wiggum.agents.llm_synthesis import LLMSynthesis
+
+        synthesis = LLMSynthesis(
+            self.state_store,
+            self.artifacts_dir,
+            client=self.llm_client,
+            offline_fixtures=self.offline_fixtures,
+        )
+        if not self._has_llm_budget(state) or not synthesis.is_available():
+            self._record_capability(
+                state, "skipped", "llm_synthesis", reason="budget or no client"
+            )
+            return
+        context = {
+            "signals": (state.get("static_scan") or {}).get("signals") or {},
+            "graph": state.get("graph_analysis") or {},
+            "solodit": (state.get("solodit") or {}).get("matches") or [],
+        }
+        with _TimedStage() as stage:
+            synthesis.summarize(context, state)
+        self._record_capability(
+            state,
+            "executed",
+            "llm_synthesis",
+            started_at=stage.started_at,
+            finished_at=stage.finished_at,
+        )
+        state["budget"]["spent"] = state["budget"].get("spent", 0) + 1
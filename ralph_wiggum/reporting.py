@@ -0,0 +1,111 @@
+"""Markdown report generation for a completed audit run."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ralph_wiggum.scoring import (
+    Scorer,
+    collect_findings,
+    format_ranked_findings,
+    format_scoreboard_entries,
+    score_findings,
+)
+from ralph_wiggum.state import StateStore
+
+
+def _scoreboard_fresh(
+    entries: list[dict[str, Any]], findings: list[dict[str, Any]]
+) -> bool:
+    """True when the persisted scoreboard covers exactly these findings.
+
+    A scoreboard left in the state by an earlier run must not be
+    rendered against a re-scanned tree; the id comparison is cheap
+    because finding_id is memoized.
+    """
+    if len(entries) != len(findings):
+        return False
+    scorer = Scorer()
+    current = {scorer.finding_id(finding) for finding in findings}
+    return {entry.get("finding_id") for entry in entries} == current
+
+
+@dataclass
+class ReportGenerator:
+    """Renders the audit state into a human-readable markdown report."""
+
+    state_store: StateStore
+    artifacts_dir: Path
+
+    def write_report(
+        self,
+        state: dict[str, Any] | None = None,
+        report_path: Path | None = None,
+    ) -> Path:
+        if state is None:
+            state = self.state_store.load()
+        if report_path is None:
+            report_path = self.artifacts_dir / "report.md"
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Sections stream straight to the file as encoded chunks: no
+        # accumulated list of lines, no final join pass, and no second
+        # whole-report string held for write_text's encode.
+        # Section inputs bound once up front: each `.get(..., {})`
+        # chain re-runs the lookups and allocates a fresh empty dict
+        # every time it is evaluated.
+        static_scan = state.get("static_scan") or {}
+        signals = static_scan.get("signals") or {}
+        graph = state.get("graph_analysis") or {}
+        summary = (state.get("llm_synthesis") or {}).get("summary")
+        capabilities = state.get("capabilities") or {}
+
+        with report_path.open("wb") as fh:
+            write = fh.write
+            write(b"# Ralph Wiggum Audit Report\n\n## Signals\n")
+            if signals:
+                for category in sorted(signals):
+                    write(f"- {category}: {signals[category]}\n".encode())
+            else:
+                write(b"- none\n")
+
+            write(b"\n## Ranked findings\n")
+            # A scoreboard built earlier in the run already carries the
+            # scores; render from it instead of walking and scoring
+            # every finding a second time — but only when it still
+            # matches the findings actually in the state, so a stale
+            # scoreboard from a previous run never masks a re-scan.
+            findings = collect_findings(state)
+            entries = (state.get("scoreboard") or {}).get("entries")
+            if entries and _scoreboard_fresh(entries, findings):
+                rows = format_scoreboard_entries(entries)
+            else:
+                scored = score_findings(findings)
+                rows = format_ranked_findings(scored) if scored else None
+            if rows:
+                for row in rows:
+                    write(row.encode())
+                    write(b"\n")
+            else:
+                write(b"No findings.\n")
+
+            write(b"\n## Graph analysis\n")
+            if graph:
+                write(
+                    f"- backend: {graph.get('backend')}\n"
+                    f"- risk score: {graph.get('risk_score')}\n"
+                    f"- cycles: {len(graph.get('cycles') or [])}\n".encode()
+                )
+            else:
+                write(b"- not run\n")
+
+            write(b"\n## Summary\n")
+            write((summary or "No LLM summary available.").encode())
+            write(b"\n\n## Capabilities\n")
+            for bucket in ("executed", "skipped"):
+                entries = capabilities.get(bucket) or []
+                names = ", ".join(entry.get("name", "?") for entry in entries)
+                write(f"- {bucket}: {names or 'none'}\n".encode())
+        return report_path
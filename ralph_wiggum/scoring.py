@@ -0,0 +1,450 @@
+"""Finding collection, scoring and ranking.
+
+Scores combine severity, tool confidence, evidence and reproduction
+status into a single integer so findings from different tools can be
+ranked on one scale.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from operator import itemgetter
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+SEVERITY_WEIGHTS = {
+    "critical": 5,
+    "high": 4,
+    "medium": 3,
+    "low": 2,
+    "informational": 1,
+}
+
+CONFIDENCE_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+
+
+def _normalize_level(value: Any) -> str:
+    return str(value or "").strip().lower()
+
+
+def _severity_weight(value: Any) -> int:
+    return SEVERITY_WEIGHTS.get(_normalize_level(value), 0)
+
+
+def _confidence_weight(value: Any) -> int:
+    return CONFIDENCE_WEIGHTS.get(_normalize_level(value), 0)
+
+
+# Memo tables for collect_findings/score_findings: the kernel and the
+# report generator walk the same unchanged state several times per run.
+# Keys are identity+length fingerprints of the input containers — the
+# state's finding lists are only ever replaced or appended to, both of
+# which change the fingerprint. Tables are cleared when they grow past
+# a handful of states to stay bounded.
+_FINDINGS_CACHE: dict[int, tuple[tuple[int, ...], list[dict[str, Any]]]] = {}
+_SCORED_CACHE: dict[int, tuple[tuple[int, ...], list[ScoredEntry]]] = {}
+_CACHE_LIMIT = 16
+
+
+def _container_fingerprint(*containers: Any) -> tuple[int, ...]:
+    fingerprint: list[int] = []
+    for container in containers:
+        if isinstance(container, list):
+            fingerprint.append(id(container))
+            fingerprint.append(len(container))
+            fingerprint.append(id(container[0]) if container else 0)
+            fingerprint.append(id(container[-1]) if container else 0)
+        else:
+            fingerprint.append(-1)
+    return tuple(fingerprint)
+
+
+def collect_findings(state: dict[str, Any]) -> list[dict[str, Any]]:
+    """All findings from the state: top-level plus static-scan output."""
+    top = state.get("findings")
+    static = (state.get("static_scan") or {}).get("findings")
+    key = _container_fingerprint(top, static)
+    cached = _FINDINGS_CACHE.get(id(state))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    findings = []
+    if isinstance(top, list):
+        findings.extend(f for f in top if isinstance(f, dict))
+    if isinstance(static, list):
+        findings.extend(f for f in static if isinstance(f, dict))
+    if len(_FINDINGS_CACHE) >= _CACHE_LIMIT:
+        _FINDINGS_CACHE.clear()
+    _FINDINGS_CACHE[id(state)] = (key, findings)
+    return findings
+
+
+@dataclass(slots=True)
+class ScoredEntry:
+    """One scored finding on the ranking scale.
+
+    Slots instead of a dict: thousands of these are built per run, and
+    the fixed field set cuts per-entry memory several-fold while making
+    each read a direct attribute load instead of a hash lookup.
+    """
+
+    score: int
+    sev_w: int
+    conf_w: int
+    severity: str
+    confidence: str
+    source_tool: str
+    category: str
+    description: str
+
+    def reset(
+        self,
+        score: int,
+        sev_w: int,
+        conf_w: int,
+        severity: str,
+        confidence: str,
+        source_tool: str,
+        category: str,
+        description: str,
+    ) -> ScoredEntry:
+        """Rewrite every field in place and return self (pool reuse)."""
+        self.score = score
+        self.sev_w = sev_w
+        self.conf_w = conf_w
+        self.severity = severity
+        self.confidence = confidence
+        self.source_tool = source_tool
+        self.category = category
+        self.description = description
+        return self
+
+
+class _EntryPool(threading.local):
+    """Per-thread free list of ScoredEntry objects.
+
+    Batch workloads (trend runs, CI) rebuild scoreboards over and over;
+    recycling entries instead of allocating fresh ones per finding
+    removes most of the small-object churn. Thread-local state keeps
+    acquire/release lock-free under the kernel's parallel stages.
+    """
+
+    def __init__(self) -> None:
+        self.free: list[ScoredEntry] = []
+
+    def acquire(self) -> ScoredEntry:
+        if self.free:
+            return self.free.pop()
+        return ScoredEntry(0, 0, 0, "", "", "", "", "")
+
+    def release_all(self, entries: list[ScoredEntry]) -> None:
+        self.free.extend(entries)
+
+
+_ENTRY_POOL = _EntryPool()
+
+
+def _score_finding(
+    finding: dict[str, Any], entry: ScoredEntry | None = None
+) -> ScoredEntry:
+    # Weights are normalized once here and carried on the entry, so
+    # the sort key reads plain ints instead of re-running the
+    # strip/lower/lookup chain on every comparison.
+    sev_w = _severity_weight(finding.get("impact") or finding.get("severity"))
+    conf_w = _confidence_weight(finding.get("confidence"))
+    score = sev_w + conf_w
+    if finding.get("artifact_paths"):
+        score += 1
+    if finding.get("reproduced"):
+        score += 1
+    severity = finding.get("impact") or finding.get("severity")
+    if entry is None:
+        entry = _ENTRY_POOL.acquire()
+    return entry.reset(
+        score,
+        sev_w,
+        conf_w,
+        _normalize_level(severity) or "unknown",
+        _normalize_level(finding.get("confidence")) or "unknown",
+        finding.get("source_tool") or "unknown",
+        finding.get("category") or "unknown",
+        finding.get("description") or "",
+    )
+
+
+def _score_sort_key(item: ScoredEntry) -> tuple[Any, ...]:
+    return (
+        -item.score,
+        -item.sev_w,
+        -item.conf_w,
+        item.source_tool,
+        item.category,
+        item.description,
+    )
+
+
+# Below this many findings the array setup costs more than it saves;
+# small runs keep the plain comparison sort.
+_NUMPY_SORT_THRESHOLD = 256
+
+
+def _rank_with_numpy(scored: list[ScoredEntry]) -> list[ScoredEntry]:
+    """Composite ranking sort as one lexsort over column arrays.
+
+    For thousands of findings the tuple-building comparison sort is the
+    hot spot; lexsort ranks all entries in C. Column order mirrors
+    ``_score_sort_key`` (last key is the primary).
+    """
+    count = len(scored)
+    score = numpy.fromiter(
+        (entry.score for entry in scored), dtype=numpy.int16, count=count
+    )
+    sev = numpy.fromiter(
+        (entry.sev_w for entry in scored), dtype=numpy.int8, count=count
+    )
+    conf = numpy.fromiter(
+        (entry.conf_w for entry in scored), dtype=numpy.int8, count=count
+    )
+    tool = numpy.array([entry.source_tool for entry in scored])
+    category = numpy.array([entry.category for entry in scored])
+    description = numpy.array([entry.description for entry in scored])
+    order = numpy.lexsort((description, category, tool, -conf, -sev, -score))
+    return [scored[index] for index in order]
+
+
+def score_findings(findings: list[dict[str, Any]]) -> list[ScoredEntry]:
+    """Score every finding and return them best-first."""
+    key = _container_fingerprint(findings)
+    cached = _SCORED_CACHE.get(id(findings))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    # Entries are recycled only when their own key is invalidated: this
+    # caller handed us the same container back, so no one else can
+    # still be holding the superseded list. Lists dropped on limit
+    # eviction below may still be referenced by earlier callers, so
+    # they are never released to the pool — the entries just die with
+    # the references.
+    if cached is not None:
+        _ENTRY_POOL.release_all(cached[1])
+    scored = [_score_finding(finding) for finding in findings]
+    if numpy is not None and len(scored) > _NUMPY_SORT_THRESHOLD:
+        scored = _rank_with_numpy(scored)
+    else:
+        scored.sort(key=_score_sort_key)
+    if len(_SCORED_CACHE) >= _CACHE_LIMIT:
+        _SCORED_CACHE.clear()
+    _SCORED_CACHE[id(findings)] = (key, scored)
+    return scored
+
+
+def _truncate(text: str, limit: int = 96) -> str:
+    if len(text) <= limit:
+        return text
+    return text[: limit - 3] + "..."
+
+
+def format_ranked_findings(scored: list[ScoredEntry]) -> list[str]:
+    """Render the scored findings as markdown table rows."""
+    rows = [
+        "| # | Score | Severity | Confidence | Tool | Category | Description |",
+        "| --- | --- | --- | --- | --- | --- | --- |",
+    ]
+    # str.join over the cell tuple: no format-spec parsing per row.
+    for index, item in enumerate(scored, start=1):
+        rows.append(
+            "| "
+            + " | ".join(
+                (
+                    str(index),
+                    str(item.score),
+                    item.severity,
+                    item.confidence,
+                    item.source_tool,
+                    item.category,
+                    _truncate(item.description),
+                )
+            )
+            + " |"
+        )
+    return rows
+
+
+def format_scoreboard_entries(entries: list[dict[str, Any]]) -> list[str]:
+    """Ranked-findings table rows built from persisted scoreboard entries.
+
+    Lets the report renderer reuse a scoreboard computed earlier in the
+    run instead of re-walking and re-scoring every finding.
+    """
+    rows = [
+        "| # | Score | Severity | Confidence | Tool | Category | Description |",
+        "| --- | --- | --- | --- | --- | --- | --- |",
+    ]
+    for index, entry in enumerate(entries, start=1):
+        rows.append(
+            "| "
+            + " | ".join(
+                (
+                    str(index),
+                    str(entry["score_total"]),
+                    entry["severity"],
+                    entry["confidence"],
+                    entry["source_tool"],
+                    entry["category"],
+                    _truncate(entry["description"]),
+                )
+            )
+            + " |"
+        )
+    return rows
+
+
+# finding_id memo: trend runs rebuild scoreboards over the same
+# findings repeatedly, and the hash rounds dominate. Keyed by the
+# identity triple (plus algorithm), so the table stays valid across
+# states.
+_FID_CACHE: dict[tuple[bool, str, str, str], str] = {}
+
+
+@dataclass
+class Scorer:
+    """Builds the persistent scoreboard for a run."""
+
+    # blake2b with a 6-byte digest natively yields the 12 hex chars the
+    # old sha256[:12] scheme truncated to, without running the 52
+    # discarded chars' worth of SHA rounds. The flag restores sha256
+    # for previous_scores lookups against scoreboards written before
+    # the switch.
+    legacy_ids: bool = False
+
+    def finding_id(self, finding: dict[str, Any]) -> str:
+        """Stable 12-hex identifier derived from the finding's identity."""
+        title = finding.get("check") or finding.get("title") or ""
+        category = finding.get("category") or ""
+        location = finding.get("path") or finding.get("location") or ""
+        key = (self.legacy_ids, title, category, location)
+        fid = _FID_CACHE.get(key)
+        if fid is None:
+            raw = f"{title}|{category}|{location}".encode("utf-8")
+            if self.legacy_ids:
+                fid = hashlib.sha256(raw).hexdigest()[:12]
+            else:
+                fid = hashlib.blake2b(raw, digest_size=6).hexdigest()
+            _FID_CACHE[key] = fid
+        return fid
+
+    @staticmethod
+    def _known_run_paths(run_root: Path) -> set[str]:
+        """Every file under ``run_root``, as absolute and relative strings.
+
+        One directory walk replaces a stat() per artifact path per
+        finding during scoreboard builds.
+        """
+        known: set[str] = set()
+        root = str(run_root)
+        prefix_len = len(root) + 1
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                full = os.path.join(dirpath, filename)
+                known.add(full)
+                known.add(full[prefix_len:])
+        return known
+
+    @staticmethod
+    def _artifact_paths_valid(
+        finding: dict[str, Any],
+        known: set[str] | None = None,
+        root_prefix: str | None = None,
+    ) -> bool:
+        paths = finding.get("artifact_paths") or []
+        if known is None:
+            return any(Path(path).exists() for path in paths)
+        # Membership in the precomputed set answers for everything
+        # under the run root; only paths pointing elsewhere still stat.
+        return any(
+            path in known
+            or (
+                root_prefix is not None
+                and not path.startswith(root_prefix)
+                and Path(path).exists()
+            )
+            for path in paths
+        )
+
+    def build_scoreboard(
+        self,
+        state: dict[str, Any],
+        run_root: Path | None = None,
+        previous_scores: dict[str, int] | None = None,
+        findings: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        if findings is None:
+            findings = collect_findings(state)
+        # One walk of the run root replaces a stat() per artifact path
+        # per finding below.
+        known: set[str] | None = None
+        root_prefix: str | None = None
+        if run_root is not None:
+            known = self._known_run_paths(Path(run_root))
+            root_prefix = str(run_root) + os.sep
+        # Entries are accumulated alongside their precomputed
+        # (-score_total, finding_id) rank tuple, so the sort compares
+        # plain tuples instead of doing two dict lookups per comparison.
+        keyed: list[tuple[tuple[int, str], dict[str, Any]]] = []
+        # One pooled scratch entry serves the whole loop; its fields are
+        # copied into the persisted dict before the next reset.
+        scratch = _ENTRY_POOL.acquire()
+        for finding in findings:
+            fid = self.finding_id(finding)
+            scored = _score_finding(finding, scratch)
+            score_total = scored.score
+            if self._artifact_paths_valid(finding, known, root_prefix):
+                score_total += 1
+            # The sort weights stay on the ScoredEntry; the persisted
+            # scoreboard entry carries only the reader-facing fields.
+            entry = {
+                "finding_id": fid,
+                "score_total": score_total,
+                "severity": scored.severity,
+                "confidence": scored.confidence,
+                "source_tool": scored.source_tool,
+                "category": scored.category,
+                "description": scored.description,
+                "previous_score": (previous_scores or {}).get(fid),
+            }
+            keyed.append(((-score_total, fid), entry))
+        _ENTRY_POOL.release_all([scratch])
+        keyed.sort(key=itemgetter(0))
+        entries = [entry for _rank, entry in keyed]
+        return {"entries": entries, "total": len(entries)}
+
+    def format_scoreboard_markdown(self, scoreboard: dict[str, Any]) -> str:
+        lines = [
+            "# Scoreboard",
+            "",
+            "| # | ID | Score | Severity | Confidence | Tool | Category |",
+            "| --- | --- | --- | --- | --- | --- | --- |",
+        ]
+        for index, entry in enumerate(scoreboard["entries"], start=1):
+            lines.append(
+                "| "
+                + " | ".join(
+                    (
+                        str(index),
+                        entry["finding_id"],
+                        str(entry["score_total"]),
+                        entry["severity"],
+                        entry["confidence"],
+                        entry["source_tool"],
+                        entry["category"],
+                    )
+                )
+                + " |"
+            )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,388 @@
+"""Shared JSON state persistence for the audit pipeline."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import stat
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if msgspec is not None:
+    # Declaring the known top-level shape lets msgspec emit a
+    # specialized encoder once instead of type-dispatching on every key
+    # of an untyped dict per save. Keys outside the schema ride along
+    # in ``extras`` so nothing is dropped.
+
+    class KernelState(msgspec.Struct, omit_defaults=True):
+        """Typed mirror of the kernel state's top-level schema."""
+
+        status: Any = None
+        capabilities: Any = None
+        budget: Any = None
+        static_scan: Any = None
+        graph_analysis: Any = None
+        fuzz_agent: Any = None
+        proofs: Any = None
+        repair: Any = None
+        llm_synthesis: Any = None
+        solodit: Any = None
+        diff_review: Any = None
+        scoreboard: Any = None
+        findings: Any = None
+        agent_queue: Any = None
+        extras: dict[str, Any] = {}
+
+        @classmethod
+        def from_dict(cls, state: dict[str, Any]) -> KernelState:
+            known = {
+                field: state[field]
+                for field in cls.__struct_fields__
+                if field != "extras" and field in state
+            }
+            extras = {
+                key: value
+                for key, value in state.items()
+                if key not in cls.__struct_fields__
+            }
+            return cls(extras=extras, **known)
+
+        def to_dict(self) -> dict[str, Any]:
+            state = {
+                field: getattr(self, field)
+                for field in self.__struct_fields__
+                if field != "extras" and getattr(self, field) is not None
+            }
+            state.update(self.extras)
+            return state
+
+else:
+    KernelState = None
+
+
+@dataclass
+class StateStore:
+    """Loads and saves the pipeline state as a JSON file on disk.
+
+    The store is single-writer within a run, so the last state dict
+    that passed through ``save`` is kept as an in-memory cache and
+    served by ``load`` without re-reading and re-parsing the file.
+    """
+
+    path: Path
+    _cache: dict[str, Any] | None = field(
+        default=None, init=False, repr=False
+    )
+    _last_digest: bytes | None = field(
+        default=None, init=False, repr=False
+    )
+
+    def get_cache(self) -> dict[str, Any] | None:
+        """The last saved state dict, if any, without touching disk."""
+        return self._cache
+
+    def set_cache(self, state: dict[str, Any]) -> None:
+        self._cache = state
+
+    def load(self) -> dict[str, Any]:
+        if self._cache is not None:
+            return self._cache
+        if not self.path.exists():
+            return {}
+        if msgspec is not None:
+            # Typed decode: the parser is specialized to the known
+            # schema instead of building generic containers and
+            # re-walking them; to_dict folds extras back in.
+            raw = self.path.read_bytes()
+            return msgspec.json.decode(raw, type=KernelState).to_dict()
+        if orjson is not None:
+            return orjson.loads(self.path.read_bytes())
+        return json.loads(self.path.read_text())
+
+    def _encode(self, state: dict[str, Any], pretty: bool) -> bytes:
+        # The kernel keeps a set-based de-dup index under
+        # capabilities["_seen"]; it is in-memory bookkeeping and is
+        # dropped from the serialized form here.
+        capabilities = state.get("capabilities")
+        if isinstance(capabilities, dict) and "_seen" in capabilities:
+            state = {
+                **state,
+                "capabilities": {
+                    key: value
+                    for key, value in capabilities.items()
+                    if key != "_seen"
+                },
+            }
+        # Preference order: msgspec's specialized KernelState encoder
+        # (no per-key type dispatch), then orjson, then stdlib json.
+        if msgspec is not None:
+            encoded = msgspec.json.encode(KernelState.from_dict(state))
+            if pretty:
+                encoded = msgspec.json.format(encoded, indent=2)
+            return encoded + b"\n"
+        if orjson is not None:
+            option = orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(state, option=option)
+        if pretty:
+            text = json.dumps(state, indent=2, sort_keys=True)
+        else:
+            text = json.dumps(state, separators=(",", ":"), sort_keys=True)
+        return text.encode() + b"\n"
+
+    def save(self, state: dict[str, Any], pretty: bool = False) -> None:
+        """Persist ``state`` atomically, skipping no-op writes.
+
+        The hot path emits compact JSON — indentation is opt-in for
+        human-facing final dumps — and a digest of the last payload
+        short-circuits the write when nothing changed since the
+        previous save.
+        """
+        payload = self._encode(state, pretty)
+        digest = hashlib.blake2b(payload, digest_size=8).digest()
+        if digest == self._last_digest:
+            self._cache = state
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, self.path)
+        self._last_digest = digest
+        self._cache = state
+
+    @contextmanager
+    def transaction(self) -> Iterator[dict[str, Any]]:
+        """One load/save boundary for a whole orchestration cycle.
+
+        Yields the mutable state dict; agents mutate it in memory and the
+        file is rewritten once (atomically) on exit instead of once per
+        agent.
+        """
+        state = self.load()
+        yield state
+        self.save(state)
+
+
+@dataclass
+class SqliteStateStore(StateStore):
+    """State persistence in SQLite instead of full-file JSON rewrites.
+
+    Each top-level state key is one row, so a save touches only the
+    rows whose encoded value changed — O(delta) instead of rewriting
+    every byte of the state per mutation. WAL mode keeps writers from
+    blocking concurrent readers (trend/score tooling inspecting a live
+    run).
+    """
+
+    _conn: sqlite3.Connection | None = field(
+        default=None, init=False, repr=False
+    )
+    _key_digests: dict[str, bytes] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS state "
+                "(key TEXT PRIMARY KEY, value JSON)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _encode_value(key: str, value: Any) -> bytes:
+        if key == "capabilities" and isinstance(value, dict):
+            value = {k: v for k, v in value.items() if k != "_seen"}
+        if orjson is not None:
+            return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+        return json.dumps(
+            value, separators=(",", ":"), sort_keys=True
+        ).encode()
+
+    def load(self) -> dict[str, Any]:
+        if self._cache is not None:
+            return self._cache
+        if not self.path.exists():
+            return {}
+        loads = orjson.loads if orjson is not None else json.loads
+        rows = self._connect().execute("SELECT key, value FROM state")
+        return {key: loads(value) for key, value in rows}
+
+    def save_keys(self, state: dict[str, Any], keys: Iterable[str]) -> None:
+        """Upsert only ``keys``; rows whose payload is unchanged are
+        skipped via the same digest scheme the file store uses."""
+        rows = []
+        for key in keys:
+            payload = self._encode_value(key, state[key])
+            digest = hashlib.blake2b(payload, digest_size=8).digest()
+            if self._key_digests.get(key) != digest:
+                rows.append((key, payload))
+                self._key_digests[key] = digest
+        if rows:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO state (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    rows,
+                )
+        self._cache = state
+
+    def save(self, state: dict[str, Any], pretty: bool = False) -> None:
+        # ``pretty`` is part of the StateStore interface but has no
+        # meaning for rows in a database; accepted and ignored.
+        conn = self._connect()
+        stored = {row[0] for row in conn.execute("SELECT key FROM state")}
+        stale = stored - state.keys()
+        if stale:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM state WHERE key = ?",
+                    [(key,) for key in stale],
+                )
+            for key in stale:
+                self._key_digests.pop(key, None)
+        self.save_keys(state, list(state))
+
+
+def resolve_run_paths(run_dir: Path) -> tuple[Path, Path]:
+    """Return the ``state.json`` and artifacts paths for a run directory."""
+    candidate = Path(run_dir)
+    # One stat() instead of the exists/is_dir check-then-act pair; this
+    # runs on every replay/score/trend invocation and each stat is a
+    # round trip on network filesystems.
+    try:
+        is_dir = stat.S_ISDIR(candidate.stat().st_mode)
+    except FileNotFoundError:
+        is_dir = False
+    if is_dir:
+        return candidate / "state.json", candidate / "artifacts"
+    raise FileNotFoundError(f"run directory not found: {candidate}")
+
+
+@dataclass(slots=True)
+class CapabilityRecord:
+    """One executed/skipped capability entry.
+
+    Constructing records through this class guarantees the shape that
+    ``_check_capabilities`` otherwise has to verify field by field; the
+    record is flattened to a plain dict at the state boundary so the
+    persisted schema is unchanged.
+    """
+
+    name: str
+    reason: str | None = None
+    started_at: str | None = None
+    finished_at: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _check_capabilities(capabilities: Any) -> list[str]:
+    if not isinstance(capabilities, dict):
+        return ["capabilities is not a mapping"]
+    errors = []
+    for bucket in ("executed", "skipped"):
+        entries = capabilities.get(bucket, [])
+        if not isinstance(entries, list):
+            errors.append(f"capabilities.{bucket} is not a list")
+            continue
+        for index, entry in enumerate(entries):
+            # Typed records are well-formed by construction: one
+            # isinstance test replaces the per-field walk.
+            if isinstance(entry, CapabilityRecord):
+                if not entry.name:
+                    errors.append(f"capabilities.{bucket}[{index}] has no name")
+                continue
+            if not isinstance(entry, dict):
+                errors.append(f"capabilities.{bucket}[{index}] is not a mapping")
+                continue
+            if not entry.get("name"):
+                errors.append(f"capabilities.{bucket}[{index}] has no name")
+    return errors
+
+
+# Fields every finding must carry; checked with one set-subtract
+# against the finding's key view instead of three dict lookups.
+_REQUIRED_FINDING_FIELDS = frozenset(
+    {"source_tool", "artifact_paths", "confidence"}
+)
+
+
+def _check_findings(state: dict[str, Any]) -> list[str]:
+    top = state.get("findings")
+    static = (state.get("static_scan") or {}).get("findings")
+    errors = []
+    # chain() walks both sources without concatenating them into a
+    # throwaway combined list first.
+    combined = chain(
+        top if isinstance(top, list) else (),
+        static if isinstance(static, list) else (),
+    )
+    for index, finding in enumerate(combined):
+        if not isinstance(finding, dict):
+            errors.append(f"findings[{index}] is not a mapping")
+            continue
+        for field in sorted(_REQUIRED_FINDING_FIELDS - finding.keys()):
+            errors.append(f"findings[{index}] missing {field}")
+    return errors
+
+
+# Which state keys each section check actually reads; validation can be
+# scoped to the checks whose inputs changed.
+_SECTION_INPUTS = {
+    "capabilities": frozenset({"capabilities"}),
+    "findings": frozenset({"findings", "static_scan"}),
+}
+
+
+def validate_state(
+    state: dict[str, Any],
+    changed_keys: Iterable[str] | None = None,
+) -> list[str]:
+    """Sanity-check the state schema; returns a list of problems found.
+
+    The kernel validates after every stage, but each stage only touches
+    a couple of keys — passing ``changed_keys`` re-runs just the checks
+    whose inputs are among them, keeping repeated validation O(delta)
+    instead of O(state size).
+    """
+    changed = None if changed_keys is None else frozenset(changed_keys)
+    errors = []
+    if changed is None or changed & _SECTION_INPUTS["capabilities"]:
+        errors.extend(_check_capabilities(state.get("capabilities") or {}))
+    if changed is None or changed & _SECTION_INPUTS["findings"]:
+        errors.extend(_check_findings(state))
+    return errors
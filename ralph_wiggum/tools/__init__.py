@@ -0,0 +1 @@
+"""Wrappers around external tooling (forge, slither, linters)."""
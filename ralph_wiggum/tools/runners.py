@@ -0,0 +1,794 @@
+"""External tool runners.
+
+Each runner prefers the dockerized toolchain when a docker-compose
+service is up, falls back to a locally installed binary, and records
+its raw output under ``artifacts_dir``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import re
+import shutil
+import signal
+import subprocess
+import threading
+from bisect import bisect_right
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache, partial
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+from ralph_wiggum.jsonio import dump_json, load_json
+
+_PROBE_TIMEOUT = 10
+
+
+def _compose_token() -> int:
+    """Cache key for the compose probe: the compose file's mtime.
+
+    Editing docker-compose.yml invalidates the memo naturally;
+    RALPH_REFRESH_COMPOSE=1 drops it explicitly (e.g. after starting
+    services mid-session).
+    """
+    if os.getenv("RALPH_REFRESH_COMPOSE") == "1":
+        _compose_probe.cache_clear()
+    try:
+        return os.stat("docker-compose.yml").st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _kill_quiet(pid: int) -> None:
+    try:
+        os.kill(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def _spawn_capture(argv: list[str]) -> tuple[int, bytes]:
+    """Run a short probe command via ``posix_spawnp``, capturing stdout.
+
+    ``subprocess`` forks, duplicating the parent's page tables — a
+    real cost once the agent process carries hundreds of MB of state —
+    and runs its generic pre/post-exec machinery. The probes are tiny
+    commands issued on every run, so they spawn directly; stderr goes
+    to /dev/null and a watchdog timer kills a hung child after the
+    probe timeout. The long-running forge/slither invocations keep
+    ``subprocess``, where fork cost is noise next to the tool runtime.
+    """
+    out_read, out_write = os.pipe()
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        pid = os.posix_spawnp(
+            argv[0],
+            argv,
+            os.environ,
+            file_actions=[
+                (os.POSIX_SPAWN_DUP2, out_write, 1),
+                (os.POSIX_SPAWN_DUP2, devnull, 2),
+            ],
+        )
+    except OSError:
+        os.close(out_read)
+        raise
+    finally:
+        os.close(out_write)
+        os.close(devnull)
+    watchdog = threading.Timer(_PROBE_TIMEOUT, _kill_quiet, (pid,))
+    watchdog.start()
+    chunks = []
+    try:
+        while True:
+            chunk = os.read(out_read, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(out_read)
+        _, status = os.waitpid(pid, 0)
+        watchdog.cancel()
+    return os.waitstatus_to_exitcode(status), b"".join(chunks)
+
+
+@lru_cache(maxsize=None)
+def _compose_probe(token: int) -> tuple[bool, tuple[str, ...], frozenset[str]]:
+    """(available, configured services, running services), probed once.
+
+    Every runner previously forked three ``docker compose`` processes
+    per run() just to answer these; one memoized bundle serves all of
+    them for the life of the process. The three probes are independent,
+    so they launch together and the bundle costs one probe's wall time
+    instead of three in sequence.
+    """
+    commands = (
+        ["docker", "compose", "version"],
+        ["docker", "compose", "config", "--services"],
+        ["docker", "compose", "ps", "--services", "--filter", "status=running"],
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=len(commands)) as pool:
+            version, config, ps = pool.map(_spawn_capture, commands)
+    except OSError:  # docker binary missing
+        return False, (), frozenset()
+    if version[0] != 0:
+        return False, (), frozenset()
+    services = (
+        tuple(config[1].decode(errors="ignore").split())
+        if config[0] == 0
+        else ()
+    )
+    running = (
+        frozenset(ps[1].decode(errors="ignore").split())
+        if ps[0] == 0
+        else frozenset()
+    )
+    return True, services, running
+
+
+def _running_compose_service(keywords: tuple[str, ...]) -> str | None:
+    """First configured service matching a keyword, if it is running."""
+    available, services, running = _compose_probe(_compose_token())
+    if not available:
+        return None
+    for service in services:
+        if any(word in service for word in keywords):
+            return service if service in running else None
+    return None
+
+
+def _run_streaming(
+    command: list[str], cwd: Path, log_path: Path, timeout: int
+) -> int:
+    """Run ``command`` with combined output streamed to ``log_path``.
+
+    The child writes straight into the log fd, so multi-MB tool output
+    never transits the Python heap the way ``capture_output`` buffers
+    it (and is never decoded just to be re-encoded on write).
+    """
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "wb") as fh:
+        process = subprocess.Popen(
+            command, cwd=cwd, stdout=fh, stderr=subprocess.STDOUT
+        )
+        try:
+            return process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+
+
+_FAIL_LINE_RE = re.compile(rb"(?im)^.*fail.*$")
+
+
+def _extract_failures_from_log(log_path: Path) -> list[str]:
+    """Failure lines from a streamed log, scanned as mmapped bytes."""
+    try:
+        fh = open(log_path, "rb")
+    except OSError:
+        return []
+    with fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty log
+            return []
+        with mm:
+            return [
+                match.group(0)
+                .decode("utf-8", errors="ignore")
+                .strip()
+                for match in _FAIL_LINE_RE.finditer(mm)
+            ]
+
+
+def _iter_sol(root: str) -> Iterator[str]:
+    """Yield paths of ``.sol`` files under ``root`` via one scandir walk.
+
+    DirEntry answers is_dir/is_file from the readdir data already in
+    hand, so the walk does roughly half the stat calls of
+    ``rglob("*.sol")`` + ``is_file()`` and allocates no intermediate
+    Path objects.
+    """
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".sol") and entry.is_file(
+                    follow_symlinks=False
+                ):
+                    yield entry.path
+
+
+def _solidity_files(root: Path) -> list[Path]:
+    """All Solidity sources under ``root``, sorted for stable output."""
+    return [Path(path) for path in sorted(_iter_sol(str(root)))]
+
+
+@dataclass
+class FoundryRunner:
+    """Runs ``forge test`` (fuzzing included) against a target tree."""
+
+    artifacts_dir: Path
+    fuzz_runs: int = 256
+    timeout_seconds: int = 600
+
+    def run(self, target_path: Path) -> dict[str, Any]:
+        command, via = self._resolve_execution()
+        if command is None:
+            return {
+                "status": "skipped",
+                "reason": "forge unavailable (no docker service, no local binary)",
+            }
+        # forge parallelizes across tests, not across runs of one test,
+        # so a few slow fuzz tests serialize the suite. Splitting the
+        # run budget into per-core shards with distinct seeds keeps
+        # every core busy; two cores are left for the agent itself.
+        shard_count = max(1, min((os.cpu_count() or 1) - 2, self.fuzz_runs))
+        shards = self._shard_runs(self.fuzz_runs, shard_count)
+        if len(shards) == 1:
+            commands = [command]
+        else:
+            commands = [
+                self._shard_command(command, runs, seed)
+                for seed, runs in enumerate(shards)
+            ]
+        log_path = self.artifacts_dir / "forge_test.log"
+        if len(commands) == 1:
+            log_paths = [log_path]
+        else:
+            log_paths = [
+                self.artifacts_dir / f"forge_test.shard{index}.log"
+                for index in range(len(commands))
+            ]
+        try:
+            if len(commands) == 1:
+                returncodes = [
+                    _run_streaming(
+                        commands[0], target_path, log_path, self.timeout_seconds
+                    )
+                ]
+            else:
+                with ThreadPoolExecutor(max_workers=len(commands)) as pool:
+                    futures = [
+                        pool.submit(
+                            _run_streaming,
+                            shard_command,
+                            target_path,
+                            shard_log,
+                            self.timeout_seconds,
+                        )
+                        for shard_command, shard_log in zip(commands, log_paths)
+                    ]
+                    returncodes = [future.result() for future in futures]
+        except subprocess.TimeoutExpired:
+            return {"status": "timeout", "via": via}
+        if len(log_paths) > 1:
+            # The main log stays a small index; the shard output itself
+            # never transits this process.
+            log_path.write_text(
+                "".join(
+                    f"### shard {index}: {shard_log}\n"
+                    for index, shard_log in enumerate(log_paths)
+                )
+            )
+        failures: list[str] = []
+        seen: set[str] = set()
+        for shard_log in log_paths:
+            for line in _extract_failures_from_log(shard_log):
+                if line not in seen:
+                    seen.add(line)
+                    failures.append(line)
+        succeeded = all(code == 0 for code in returncodes)
+        return {
+            "status": "success" if succeeded else "failed",
+            "via": via,
+            "shards": len(commands),
+            "failures": failures,
+            "log": str(log_path),
+        }
+
+    @staticmethod
+    def _shard_runs(total: int, shard_count: int) -> list[int]:
+        """Split ``total`` fuzz runs into near-equal non-zero shards."""
+        base, remainder = divmod(total, shard_count)
+        shards = [base + 1] * remainder + [base] * (shard_count - remainder)
+        return [runs for runs in shards if runs > 0]
+
+    @staticmethod
+    def _shard_command(
+        command: list[str], runs: int, seed: int
+    ) -> list[str]:
+        sharded = list(command)
+        index = sharded.index("--fuzz-runs")
+        sharded[index + 1] = str(runs)
+        return sharded + ["--fuzz-seed", str(seed)]
+
+    def _resolve_execution(self) -> tuple[list[str] | None, str | None]:
+        service = _running_compose_service(("foundry", "forge"))
+        if service is not None:
+            return (
+                [
+                    "docker",
+                    "compose",
+                    "exec",
+                    "-T",
+                    service,
+                    "forge",
+                    "test",
+                    "--fuzz-runs",
+                    str(self.fuzz_runs),
+                ],
+                "docker-compose",
+            )
+        if shutil.which("forge"):
+            return (
+                ["forge", "test", "--fuzz-runs", str(self.fuzz_runs)],
+                "local",
+            )
+        return None, None
+
+
+def _valid_report(path: Path) -> bool:
+    """True when ``path`` parses as JSON.
+
+    Consumers stream the report from disk (``iter_detectors``); nothing
+    reads a materialized copy, so the parse is a validity probe only and
+    the decoded tree is dropped immediately. ``load_json`` keeps it on
+    the orjson fast path when available.
+    """
+    try:
+        load_json(path)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+@dataclass
+class SlitherRunner:
+    """Runs slither against a target tree and captures its JSON report."""
+
+    artifacts_dir: Path
+    timeout_seconds: int = 900
+
+    # The report/log paths are referenced by every finding's
+    # artifact_paths; serialize the Path arithmetic exactly once.
+    @cached_property
+    def slither_json_path(self) -> str:
+        return str(self.artifacts_dir / "slither.json")
+
+    @cached_property
+    def slither_log_path(self) -> str:
+        return str(self.artifacts_dir / "slither.log")
+
+    def run(self, target_path: Path) -> dict[str, Any]:
+        output_path = Path(self.slither_json_path)
+        log_path = Path(self.slither_log_path)
+        if (
+            os.getenv("RALPH_OFFLINE") == "1"
+            or os.getenv("RALPH_USE_EXISTING_SLITHER") == "1"
+        ):
+            if output_path.exists():
+                return {
+                    "status": "reused",
+                    "artifacts": [self.slither_json_path, self.slither_log_path],
+                }
+            return {
+                "status": "skipped",
+                "reason": "offline mode and no existing slither.json",
+            }
+        # Slither is deterministic over the sources, so an unchanged
+        # tree can reuse the report produced for the same content hash
+        # and skip the analysis subprocess entirely — the dominant cost
+        # of repeated runs in an agent loop.
+        cache_path = None
+        if os.getenv("RALPH_SLITHER_NOCACHE") != "1":
+            digest = self._tree_digest(target_path)
+            cache_path = self.artifacts_dir / f"slither-{digest[:16]}.json"
+            # A truncated or corrupt cache entry falls through to a
+            # real run rather than poisoning every invocation.
+            if cache_path.exists() and _valid_report(cache_path):
+                self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(cache_path, output_path)
+                return {
+                    "status": "cached",
+                    "artifacts": [
+                        self.slither_json_path,
+                        self.slither_log_path,
+                    ],
+                }
+        command, via = self._resolve_execution(target_path, output_path)
+        if command is None:
+            return {
+                "status": "skipped",
+                "reason": "slither unavailable (no docker service, no local binary)",
+            }
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            _run_streaming(command, target_path, log_path, self.timeout_seconds)
+        except subprocess.TimeoutExpired:
+            return {"status": "timeout", "via": via}
+        report_ok = output_path.exists() and _valid_report(output_path)
+        if report_ok and cache_path is not None:
+            # A real copy, not a hardlink: slither rewrites slither.json
+            # in place on the next run, and a linked cache entry would
+            # be rewritten with it. Temp file + os.replace keeps the
+            # entry atomic, as the other artifact caches do.
+            tmp_path = cache_path.with_suffix(".tmp")
+            shutil.copyfile(output_path, tmp_path)
+            os.replace(tmp_path, cache_path)
+        return {
+            "status": "success" if report_ok else "failed",
+            "via": via,
+            "artifacts": [self.slither_json_path, self.slither_log_path],
+        }
+
+    @staticmethod
+    def _tree_digest(target_path: Path) -> str:
+        """Content hash of the Solidity sources plus foundry config.
+
+        Built from sorted (relative path, content sha256) pairs, so the
+        digest is stable across machines and checkout locations.
+        """
+        outer = hashlib.blake2b()
+        paths = _solidity_files(target_path)
+        paths.append(Path(target_path) / "foundry.toml")
+        for path in paths:
+            try:
+                with open(path, "rb") as fh:
+                    content = hashlib.file_digest(fh, "sha256").digest()
+            except OSError:
+                continue
+            outer.update(os.path.relpath(path, target_path).encode())
+            outer.update(b"\x00")
+            outer.update(content)
+        return outer.hexdigest()
+
+    def iter_detectors(self) -> Iterator[dict[str, Any]]:
+        """Stream detector entries from ``slither.json`` one at a time.
+
+        With ijson each detector is parsed and discarded incrementally,
+        so peak memory stays flat no matter how large the report is;
+        without it the whole file is parsed once as a fallback.
+        """
+        output_path = Path(self.slither_json_path)
+        if not output_path.exists():
+            return
+        with output_path.open("rb") as fh:
+            if ijson is not None:
+                yield from ijson.items(fh, "results.detectors.item")
+                return
+            data = json.load(fh)
+        yield from (data.get("results") or {}).get("detectors") or []
+
+    def _resolve_execution(
+        self, target_path: Path, output_path: Path
+    ) -> tuple[list[str] | None, str | None]:
+        service = _running_compose_service(("slither",))
+        if service is not None:
+            return (
+                [
+                    "docker",
+                    "compose",
+                    "exec",
+                    "-T",
+                    service,
+                    "slither",
+                    ".",
+                    "--json",
+                    str(output_path),
+                ],
+                "docker-compose",
+            )
+        if shutil.which("slither"):
+            return (["slither", ".", "--json", str(output_path)], "local")
+        return None, None
+
+
+@dataclass
+class WorkbenchSlitherRunner:
+    """Single-file slither runs for the interactive workbench."""
+
+    artifacts_dir: Path
+    timeout_seconds: int = 300
+
+    def run(self, file_path: Path) -> dict[str, Any]:
+        output_path = self.artifacts_dir / "workbench_slither.json"
+        log_path = self.artifacts_dir / "workbench_slither.log"
+        if not shutil.which("slither"):
+            return {"status": "skipped", "reason": "slither unavailable"}
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            returncode = _run_streaming(
+                ["slither", str(file_path), "--json", str(output_path)],
+                file_path.parent,
+                log_path,
+                self.timeout_seconds,
+            )
+        except subprocess.TimeoutExpired:
+            return {"status": "timeout"}
+        report_ok = output_path.exists() and _valid_report(output_path)
+        return {
+            "status": "success" if report_ok else "failed",
+            "returncode": returncode,
+            "artifacts": [str(output_path)],
+        }
+
+
+# Below this many files a process pool costs more in spawn/pickle
+# overhead than the scan itself; RALPH_LINT_PARALLEL=0/1 overrides.
+_PARALLEL_LINT_THRESHOLD = 32
+
+# One alternation compiled once: the regex engine's literal scan beats
+# two separate substring passes over the buffer, and the word
+# boundaries keep identifiers like TODOS from matching.
+_MARKER_RE = re.compile(rb"\b(?:TODO|FIXME)\b")
+
+
+def _scan_one(file_path: Path, tool_name: str) -> list[dict[str, Any]]:
+    """Lint a single Solidity file for TODO/FIXME markers.
+
+    Module-level so a process pool can pickle it; results are plain
+    dicts and merge cleanly regardless of which worker produced them.
+
+    The file is mmapped and searched as raw bytes: most files have no
+    marker at all, and the byte search settles that without decoding
+    the content or materializing a line list. Line numbers, and the
+    decoded snippet, are computed only for actual hits.
+    """
+    findings: list[dict[str, Any]] = []
+    with open(file_path, "rb") as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return findings
+        with mm:
+            matches = _MARKER_RE.finditer(mm)
+            first = next(matches, None)
+            if first is None:
+                return findings
+            # Newline offsets are indexed once, only for files that
+            # actually hit; each match then maps to its line with one
+            # bisect instead of re-scanning the prefix.
+            newline_offsets = []
+            position = mm.find(b"\n")
+            while position != -1:
+                newline_offsets.append(position)
+                position = mm.find(b"\n", position + 1)
+            last_line_index = -1
+            for match in chain((first,), matches):
+                offset = match.start()
+                line_index = bisect_right(newline_offsets, offset)
+                if line_index == last_line_index:
+                    # Second marker on the same line; one finding per
+                    # line, as the line-by-line scan produced.
+                    continue
+                last_line_index = line_index
+                line_start = (
+                    newline_offsets[line_index - 1] + 1 if line_index else 0
+                )
+                line_end = (
+                    newline_offsets[line_index]
+                    if line_index < len(newline_offsets)
+                    else len(mm)
+                )
+                line_number = line_index + 1
+                snippet = (
+                    mm[line_start:line_end]
+                    .decode("utf-8", errors="ignore")
+                    .strip()[:120]
+                )
+                findings.append(
+                    {
+                        "category": "housekeeping",
+                        "check": "todo-marker",
+                        "description": snippet,
+                        "path": str(file_path),
+                        "line": line_number,
+                        "impact": "Informational",
+                        "confidence": "High",
+                        "source_tool": tool_name,
+                        "artifact_paths": [],
+                    }
+                )
+    return findings
+
+
+@dataclass
+class QuickLinterRunner:
+    """Cheap source-level lint pass: flags TODO/FIXME markers."""
+
+    artifacts_dir: Path
+    name: str = "quick_lint"
+
+    @cached_property
+    def _cache_path(self) -> Path:
+        return self.artifacts_dir / f"{self.name}.cache.json"
+
+    def _load_cache(self) -> dict[str, Any]:
+        try:
+            cache = load_json(self._cache_path)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def run(self, target_path: Path) -> dict[str, Any]:
+        paths = _solidity_files(target_path)
+        # Loop-driven agents rescan the same tree over and over; files
+        # whose (mtime_ns, size) is unchanged since the previous run
+        # reuse their cached findings without being opened at all.
+        cache = self._load_cache()
+        fresh: dict[str, list[Any]] = {}
+        to_scan: list[tuple[Path, os.stat_result]] = []
+        for path in paths:
+            st = path.stat()
+            entry = cache.get(str(path))
+            if (
+                entry
+                and entry[0] == st.st_mtime_ns
+                and entry[1] == st.st_size
+            ):
+                fresh[str(path)] = entry
+            else:
+                to_scan.append((path, st))
+        flag = os.getenv("RALPH_LINT_PARALLEL")
+        if flag is not None:
+            use_pool = flag == "1"
+        else:
+            use_pool = len(to_scan) > _PARALLEL_LINT_THRESHOLD
+        scan = partial(_scan_one, tool_name=self.name)
+        if use_pool:
+            # One task per chunk of files; the scan is interpreter-bound
+            # so processes, not threads, buy the speedup here.
+            workers = os.cpu_count() or 1
+            chunksize = max(1, len(to_scan) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                batches = list(
+                    pool.map(
+                        scan,
+                        (path for path, _st in to_scan),
+                        chunksize=chunksize,
+                    )
+                )
+        else:
+            batches = [scan(path) for path, _st in to_scan]
+        for (path, st), batch in zip(to_scan, batches):
+            fresh[str(path)] = [st.st_mtime_ns, st.st_size, batch]
+        findings = [
+            finding
+            for path in paths
+            for finding in fresh[str(path)][2]
+        ]
+        findings.sort(key=RunnerPool._finding_sort_key)
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        # Atomic rewrite keyed only on the files seen this run, so
+        # deleted files fall out of the cache naturally.
+        tmp_path = self._cache_path.with_suffix(".tmp")
+        dump_json(tmp_path, fresh, pretty=False)
+        os.replace(tmp_path, self._cache_path)
+        report_path = self.artifacts_dir / f"{self.name}.json"
+        report_path.write_text(json.dumps({"findings": findings}, indent=2) + "\n")
+        return {"status": "ok", "findings": findings, "artifacts": [str(report_path)]}
+
+
+@dataclass
+class ToolJob:
+    """A named unit of tool work for the runner pool.
+
+    ``cpu_bound`` marks jobs that burn interpreter time rather than
+    blocking on a subprocess (e.g. the quick linter); the pool routes
+    those to processes so they scale past the GIL. Such jobs must be
+    picklable (module-level or bound to picklable objects).
+    """
+
+    name: str
+    run: Callable[[], dict[str, Any]]
+    cpu_bound: bool = False
+
+
+@dataclass
+class ToolResult:
+    """Outcome of one tool job."""
+
+    name: str
+    payload: dict[str, Any]
+
+
+@dataclass
+class RunnerPool:
+    """Executes tool jobs, optionally on a thread pool.
+
+    External tools dominate wall-clock time and release the GIL while
+    blocked on subprocesses, so threads are the default concurrency
+    model; jobs flagged ``cpu_bound`` run on a process pool alongside
+    the threaded ones.
+    """
+
+    parallel: bool = False
+    max_workers: int = 4
+    executor_cls: type[Executor] = ThreadPoolExecutor
+
+    # Constant-time rank lookups instead of an if/elif ladder per call;
+    # unknown levels sort with the lowest known rank, as before.
+    _IMPACT_RANK = {"High": 0, "Medium": 1, "Low": 2, "Informational": 3}
+    _CONFIDENCE_RANK = {"High": 0, "Medium": 1, "Low": 2}
+
+    @staticmethod
+    def _finding_sort_key(finding: dict[str, Any]) -> tuple[Any, ...]:
+        return (
+            RunnerPool._IMPACT_RANK.get(finding.get("impact"), 3),
+            RunnerPool._CONFIDENCE_RANK.get(finding.get("confidence"), 3),
+            finding.get("category") or "",
+            finding.get("check") or "",
+        )
+
+    def run(self, jobs: list[ToolJob]) -> list[ToolResult]:
+        if self.parallel and len(jobs) > 1:
+            io_jobs = [job for job in jobs if not job.cpu_bound]
+            cpu_jobs = [job for job in jobs if job.cpu_bound]
+            results = []
+            with ExitStack() as stack:
+                futures: dict[Any, str] = {}
+                if io_jobs:
+                    pool = stack.enter_context(
+                        self.executor_cls(max_workers=self.max_workers)
+                    )
+                    for job in io_jobs:
+                        futures[pool.submit(job.run)] = job.name
+                if cpu_jobs:
+                    process_pool = stack.enter_context(
+                        ProcessPoolExecutor(
+                            max_workers=min(self.max_workers, len(cpu_jobs))
+                        )
+                    )
+                    for job in cpu_jobs:
+                        futures[process_pool.submit(job.run)] = job.name
+                for future in as_completed(futures):
+                    results.append(ToolResult(futures[future], future.result()))
+        else:
+            results = [ToolResult(job.name, job.run()) for job in jobs]
+        results.sort(key=lambda result: result.name)
+        return results
+
+    def merge_findings(self, results: list[ToolResult]) -> list[dict[str, Any]]:
+        # Each result's findings are decorated with their sort key once
+        # (no key recomputation per comparison), ordered per result —
+        # O(N) for the runners that already emit sorted lists — and the
+        # sorted runs are k-way merged instead of re-sorting the
+        # concatenation from scratch.
+        by_key = itemgetter(0)
+        decorated = []
+        for result in results:
+            pairs = [
+                (self._finding_sort_key(finding), finding)
+                for finding in result.payload.get("findings") or []
+            ]
+            pairs.sort(key=by_key)
+            decorated.append(pairs)
+        return [
+            finding for _key, finding in heapq.merge(*decorated, key=by_key)
+        ]
@@ -0,0 +1,42 @@
+"""Interactive workbench helpers for single-file exploration.
+
+Lighter-weight than a full kernel run: quick entry-point listing and a
+one-file slither pass for poking at a contract during review.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ralph_wiggum.tools.runners import WorkbenchSlitherRunner
+
+
+@dataclass
+class Workbench:
+    """Single-file analysis helpers backed by the workbench runner."""
+
+    artifacts_dir: Path
+
+    def entrypoints(self, file_path: Path) -> list[dict[str, Any]]:
+        """Externally callable, state-changing functions in one file."""
+        content = Path(file_path).read_text(errors="ignore")
+        results = []
+        for line_number, line in enumerate(content.splitlines(), start=1):
+            match = re.search(r"function\s+(\w+)\s*\(", line)
+            if not match:
+                continue
+            lowered = line.lower()
+            if "public" not in lowered and "external" not in lowered:
+                continue
+            if "view" in lowered or "pure" in lowered:
+                continue
+            results.append({"name": match.group(1), "line": line_number})
+        return results
+
+    def analyze(self, file_path: Path) -> dict[str, Any]:
+        """Run slither against a single file and return its payload."""
+        runner = WorkbenchSlitherRunner(self.artifacts_dir)
+        return runner.run(Path(file_path))